@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import argparse
+import json
 import os
 import platform
 import shutil
@@ -8,6 +9,8 @@ import subprocess
 import sys
 import zipapp
 from pathlib import Path
+from string import ascii_letters, digits, punctuation
+from tempfile import TemporaryDirectory
 from textwrap import dedent
 
 parser = argparse.ArgumentParser(
@@ -61,11 +64,34 @@ def check():
         exit(1)
 
 
+def bake_fonts(directory: Path) -> bool:
+    """Render glyphs shown by the game into `directory`, so that they are not
+    rendered at runtime. The game renders glyphs which are not baked itself.
+    """
+    assets_path = Path(__file__).parent / "mystery" / "assets"
+    try:
+        import pyglet
+
+        from mystery.resource.baked_font import bake_font, font_chars
+        from mystery.resource.manager import FONT_NAME, GLYPH_SIZES, SUPPORTED_LANG
+
+        pyglet.font.add_file(str(assets_path / "unifont.otf"))
+        texts = [ascii_letters, digits, punctuation, " ", *SUPPORTED_LANG.values()]
+        for path in sorted((assets_path / "i18n").glob("*.json")):
+            texts.extend(json.loads(path.read_text(encoding="utf-8")).values())
+        bake_font(FONT_NAME, GLYPH_SIZES, font_chars(texts), directory)
+    except Exception as e:
+        print(f"fonts are not baked: {e}")
+        return False
+    return True
+
+
 def build_executable(pack_into_zip: bool = False):
     base_path = Path(__file__).parent
     if (pyi_exe := shutil.which("pyinstaller")) is None:
         print("PyInstaller is not installed")
         exit(1)
+    fonts_dir = TemporaryDirectory()
     command = [
         pyi_exe,
         "-D",
@@ -77,9 +103,12 @@ def build_executable(pack_into_zip: bool = False):
         "--noconfirm",
         "--clean",
     ]
+    if bake_fonts(Path(fonts_dir.name)):
+        command.extend(["--add-data", f"{fonts_dir.name}{os.pathsep}assets/fonts"])
     if sys.platform in ["darwin", "win32"]:
         command.extend(["-w"])
     result = subprocess.run(command, check=False)
+    fonts_dir.cleanup()
     if result.returncode != 0:
         print(f"PyInstaller has returned a non-zero exit status {result.returncode}")
         exit(1)
@@ -106,6 +135,7 @@ def build_pyz(compressed: bool = False):
         ignore=shutil.ignore_patterns("*.pyc", "__pycache__"),
         dirs_exist_ok=True,
     )
+    bake_fonts(base_path / "build" / "mystery" / "assets" / "fonts")
     result = subprocess.run(
         [
             sys.executable,
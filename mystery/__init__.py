@@ -1,45 +1,101 @@
-from locale import getlocale
-from logging import getLogger
-from pathlib import Path
+version = "0.0.1"
 
-# Disable pytmx's logger.
-getLogger("pytmx").setLevel(999)
+# `data_path`, `settings_path`, `game_setting` and `resmgr` are created when
+# they are used first, see `__getattr__`. So modules such as `mystery.utils`
+# can be imported without loading pyglet's resources or creating any file.
 
-from pyglet import version as pyglet_ver
-from pyglet.resource import get_data_path, get_settings_path
-from pytmx import __version__ as pytmx_ver
 
-from mystery.resource import ResourceManager
-from mystery.setting import Setting
+def _check_dependencies():
+    from logging import getLogger
 
-version = "0.0.1"
+    # Disable pytmx's logger, which logs when pytmx is imported.
+    getLogger("pytmx").setLevel(999)
+
+    from pyglet import version as pyglet_ver
+    from pytmx import __version__ as pytmx_ver
+
+    if pyglet_ver != "2.0.17":
+        print(f"This game must use pyglet 2.0.17, but {pyglet_ver} found.")
+        exit(1)
+    if pytmx_ver != (3, 32):
+        print("This game must use pytmx 3.32, but {}.{} found.".format(*pytmx_ver))
+        exit(1)
+
+
+def _create_data_path() -> "Path":
+    from pathlib import Path
+
+    from pyglet.resource import get_data_path
+
+    data_path = Path(get_data_path("mystery"))
+    if not data_path.exists():
+        data_path.mkdir()
+    for subpath in ["cache", "log", "saves", "screenshots"]:
+        if not (p := data_path / subpath).exists():
+            p.mkdir()
+    return data_path
+
+
+def _create_settings_path() -> "Path":
+    from pathlib import Path
+
+    from pyglet.resource import get_settings_path
+
+    settings_path = Path(get_settings_path("mystery"))
+    if not settings_path.exists():
+        settings_path.mkdir()
+    return settings_path
+
+
+def _create_game_setting():
+    from mystery.setting import Setting
+
+    return Setting(__getattr__("settings_path"))
+
+
+def _create_resmgr():
+    from locale import getlocale
+
+    from mystery.resource import ResourceManager
+
+    game_setting = __getattr__("game_setting")
+    resmgr = ResourceManager(__getattr__("data_path") / "cache")
+    if game_setting["lang"] == "auto":
+        lang_code = getlocale()[0].lower()
+    else:
+        lang_code = game_setting.get("lang", "en_us")
+    resmgr.language = lang_code
+    return resmgr
+
+
+_lazy_attributes = {
+    "data_path": _create_data_path,
+    "settings_path": _create_settings_path,
+    "game_setting": _create_game_setting,
+    "resmgr": _create_resmgr,
+}
+_dependencies_checked = False
+
+
+def __getattr__(name: str):
+    global _dependencies_checked
+
+    if name not in _lazy_attributes:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name not in globals():
+        from mystery.profiler import startup_profiler
+
+        if not _dependencies_checked:
+            with startup_profiler.phase("check_dependencies"):
+                _check_dependencies()
+            _dependencies_checked = True
+        with startup_profiler.phase(name):
+            globals()[name] = _lazy_attributes[name]()
+    return globals()[name]
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_lazy_attributes})
 
-# Check version of dependencies.
-if pyglet_ver != "2.0.17":
-    print(f"This game must use pyglet 2.0.17, but {pyglet_ver} found.")
-    exit(1)
-if pytmx_ver != (3, 32):
-    print("This game must use pytmx 3.32, but {}.{} found.".format(*pytmx_ver))
-    exit(1)
-
-data_path = Path(get_data_path("mystery"))
-settings_path = Path(get_settings_path("mystery"))
-# Create data path.
-if not data_path.exists():
-    data_path.mkdir()
-for subpath in ["log", "saves", "screenshots"]:
-    if not (p := data_path / subpath).exists():
-        p.mkdir()
-# Create settings path.
-if not settings_path.exists():
-    settings_path.mkdir()
-game_setting = Setting(settings_path)
-
-resmgr = ResourceManager()
-if game_setting["lang"] == "auto":
-    lang_code = getlocale()[0].lower()
-else:
-    lang_code = game_setting.get("lang", "en_us")
-resmgr.language = lang_code
 
 __all__ = "version", "data_path", "game_setting", "resmgr"
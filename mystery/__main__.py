@@ -1,4 +1,12 @@
 import sys
+
+# Start before the game is imported, so that imports are profiled too.
+if "--profile-startup" in sys.argv[1:]:
+    from mystery.profiler import startup_profiler
+
+    startup_profiler.start()
+
+from argparse import ArgumentParser
 from json import dump
 from time import strftime
 from traceback import format_exc, print_exc
@@ -6,7 +14,8 @@ from traceback import format_exc, print_exc
 from pyglet import app, clock, gl
 from pyglet.image import Texture
 
-from mystery import data_path, game_setting, version
+from mystery import data_path, version
+from mystery.profiler import startup_profiler
 from mystery.scene import GameWindow
 from mystery.scene.menu import MenuScene
 
@@ -28,7 +37,36 @@ def record_error():
         )
 
 
+def record_startup(window: GameWindow, first_frame: tuple):
+    """Save the report of `startup_profiler` and quit."""
+    gl.glFinish()
+    startup_profiler.end(first_frame)
+    report = startup_profiler.stop()
+    report["gameVersion"] = version
+    report["platform"] = sys.platform
+    report["pythonVersion"] = "{}.{}.{}".format(*sys.version_info)
+    with open(data_path / "log" / strftime("startup_%Y%m%d_%H%M%S.json"), "w+") as f:
+        dump(report, f, ensure_ascii=False, indent=4)
+    window.close()
+    app.exit()
+
+
 def start():
+    parser = ArgumentParser(prog="mystery")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="save how long the startup takes to the log and quit",
+    )
+    parser.add_argument(
+        "--trace-frames",
+        type=int,
+        default=0,
+        metavar="N",
+        help="save a trace of the first N frames to the log",
+    )
+    args = parser.parse_args()
+
     gl.glEnable(gl.GL_LINE_SMOOTH)
     gl.glEnable(gl.GL_POLYGON_SMOOTH)
     gl.glEnable(gl.GL_BLEND)
@@ -39,11 +77,29 @@ def start():
     Texture.default_min_filter = gl.GL_NEAREST
     Texture.default_mag_filter = gl.GL_NEAREST
     try:
-        window = GameWindow(768, 576, resizable=True)
-        window.add_scene("menu", MenuScene)
-        window.switch_scene("menu")
-        clock.schedule_interval(window.draw, 1 / game_setting["fps"])
-        app.run()
+        with startup_profiler.phase("create_window"):
+            window = GameWindow(768, 576, resizable=True)
+        with startup_profiler.phase("create_menu_scene"):
+            window.add_scene("menu", MenuScene)
+        with startup_profiler.phase("switch_scene"):
+            window.switch_scene("menu")
+        if args.trace_frames > 0:
+            window.start_trace(args.trace_frames)
+        if args.profile_startup:
+            first_frame = startup_profiler.begin("first_frame")
+
+            def on_refresh(dt):
+                # The frame is presented after `on_refresh`.
+                window.remove_handler("on_refresh", on_refresh)
+                clock.schedule_once(lambda dt: record_startup(window, first_frame), 0)
+
+            window.push_handlers(on_refresh=on_refresh)
+        window.schedule_draw()
+        window.hitch_detector.start()
+        # The window schedules its own frames, and is only drawn when it
+        # changes.
+        app.run(None)
+        window.hitch_detector.stop()
     except:
         record_error()
         exit(1)
@@ -4,52 +4,58 @@ from typing import Optional
 from pyglet.event import EventDispatcher
 from pyglet.graphics import Batch, Group
 from pyglet.image import Animation, AnimationFrame, ImageGrid
-from pyglet.math import Vec2
 from pyglet.window import key
 
 from mystery import resmgr
 from mystery.depth_sprite import DepthSprite as Sprite
-
-idle_img = resmgr.loader.image("textures/character/idle.png")
-idle_seq = ImageGrid(idle_img, 4, 3).get_texture_sequence()
-run_img = resmgr.loader.image("textures/character/run.png")
-run_seq = ImageGrid(run_img, 4, 8).get_texture_sequence()
-sit_img = resmgr.loader.image("textures/character/sit.png")
-sit_seq = ImageGrid(sit_img, 4, 3).get_texture_sequence()
-walk_img = resmgr.loader.image("textures/character/walk.png")
-walk_seq = ImageGrid(walk_img, 4, 8).get_texture_sequence()
-bubble_img = resmgr.loader.image("textures/character/bubble.png")
-bubble_seq = ImageGrid(bubble_img, 4, 8).get_texture_sequence()
-
-char_anime = {
-    "idle": {},
-    "run": {},
-    "sit": {},
-    "walk": {},
-}
-bubble_anime = {}
-# Idle animations.
-for n, direction in enumerate(["right", "down", "left", "up"]):
-    frame1 = AnimationFrame(idle_seq[(n, 0)], 0.4)
-    frame2 = AnimationFrame(idle_seq[(n, 1)], 0.1)
-    frame3 = AnimationFrame(idle_seq[(n, 2)], 0.4)
-    char_anime["idle"][direction] = Animation([frame1, frame2, frame3, frame2])
-# Run and walk animations.
-for state, seq in {"run": run_seq, "walk": walk_seq}.items():
-    for m, direction in enumerate(["right", "down", "left", "up"]):
+from mystery.resource.asset import asset
+from mystery.trace import traced
+
+
+@asset
+def char_anime() -> dict[str, dict[str, Animation]]:
+    idle_img = resmgr.atlas_image("textures/character/idle.png")
+    idle_seq = ImageGrid(idle_img, 4, 3).get_texture_sequence()
+    run_img = resmgr.atlas_image("textures/character/run.png")
+    run_seq = ImageGrid(run_img, 4, 8).get_texture_sequence()
+    walk_img = resmgr.atlas_image("textures/character/walk.png")
+    walk_seq = ImageGrid(walk_img, 4, 8).get_texture_sequence()
+    anime = {
+        "idle": {},
+        "run": {},
+        "sit": {},
+        "walk": {},
+    }
+    # Idle animations.
+    for n, direction in enumerate(["right", "down", "left", "up"]):
+        frame1 = AnimationFrame(idle_seq[(n, 0)], 0.4)
+        frame2 = AnimationFrame(idle_seq[(n, 1)], 0.1)
+        frame3 = AnimationFrame(idle_seq[(n, 2)], 0.4)
+        anime["idle"][direction] = Animation([frame1, frame2, frame3, frame2])
+    # Run and walk animations.
+    for state, seq in {"run": run_seq, "walk": walk_seq}.items():
+        for m, direction in enumerate(["right", "down", "left", "up"]):
+            all_frames = []
+            for n in range(8):
+                frame = AnimationFrame(seq[(m, n)], 0.0625)
+                all_frames.append(frame)
+            anime[state][direction] = Animation(all_frames)
+    return anime
+
+
+@asset
+def bubble_anime() -> dict[str, Animation]:
+    bubble_img = resmgr.atlas_image("textures/character/bubble.png")
+    bubble_seq = ImageGrid(bubble_img, 4, 8).get_texture_sequence()
+    anime = {}
+    for i, state in enumerate(["question", "exclamation", "dots", "love"]):
         all_frames = []
-        for n in range(8):
-            frame = AnimationFrame(seq[(m, n)], 0.0625)
+        for j in range(8):
+            duration = 0.1 if j < 7 else 1
+            frame = AnimationFrame(bubble_seq[(i, j)], duration)
             all_frames.append(frame)
-        char_anime[state][direction] = Animation(all_frames)
-# Bubble animations.
-for i, state in enumerate(["question", "exclamation", "dots", "love"]):
-    all_frames = []
-    for j in range(8):
-        duration = 0.1 if j < 7 else 1
-        frame = AnimationFrame(bubble_seq[(i, j)], duration)
-        all_frames.append(frame)
-    bubble_anime[state] = Animation(all_frames)
+        anime[state] = Animation(all_frames)
+    return anime
 
 
 class CharacterDirection(StrEnum):
@@ -86,10 +92,15 @@ class Character(EventDispatcher):
         self._batch = batch
         self._group = Group(parent=group)
         self._char_sprite = Sprite(
-            char_anime["idle"]["up"], 0, 0, 1, batch=self._batch, group=self._group
+            char_anime.get()["idle"]["up"],
+            0,
+            0,
+            1,
+            batch=self._batch,
+            group=self._group,
         )
         self._bubble_sprite = Sprite(
-            bubble_anime["dots"],
+            bubble_anime.get()["dots"],
             self._char_sprite.x + 30,
             self._char_sprite.y + 50,
             1,
@@ -98,6 +109,9 @@ class Character(EventDispatcher):
         )
         self._bubble_sprite.visible = False
         self._bubble_sprite.set_handler("on_animation_end", self._reset_bubble)
+        # The position in game logic, and the one of the previous tick.
+        self._position = (0, 0)
+        self._prev_position = (0, 0)
 
         self._state = CharacterState.IDLE
         self._direction = CharacterDirection.UP
@@ -114,10 +128,10 @@ class Character(EventDispatcher):
             key.UP: CharacterDirection.UP,
         }
         self._move_vec = {
-            CharacterDirection.RIGHT: Vec2(8, 0),
-            CharacterDirection.DOWN: Vec2(0, -8),
-            CharacterDirection.LEFT: Vec2(-8, 0),
-            CharacterDirection.UP: Vec2(0, 8),
+            CharacterDirection.RIGHT: (8, 0),
+            CharacterDirection.DOWN: (0, -8),
+            CharacterDirection.LEFT: (-8, 0),
+            CharacterDirection.UP: (0, 8),
         }
 
     @property
@@ -185,42 +199,59 @@ class Character(EventDispatcher):
         if bubble == CharacterBubble.EMPTY:
             self._bubble_sprite.visible = False
         else:
-            self._bubble_sprite.image = bubble_anime[self._bubble]
+            self._bubble_sprite.image = bubble_anime.get()[self._bubble]
             self._bubble_sprite.visible = True
 
     @property
     def position(self) -> tuple[int, int]:
-        return self._char_sprite.position[:2]
+        return self._position
 
     @position.setter
     def position(self, pos: tuple[int, int]):
         x, y, *_ = pos
+        self._position = self._prev_position = (x, y)
+        self._move_sprites(x, y)
+
+    @property
+    def render_position(self) -> tuple[int, int]:
+        """The position where the character is drawn."""
+        return self._char_sprite.position[:2]
+
+    def _move_sprites(self, x: int, y: int):
         self._char_sprite.position = (x, y, 1)
         self._bubble_sprite.position = (x + 30, y + 50, 1)
 
     def _reset_bubble(self):
         self.bubble = CharacterBubble.EMPTY
 
+    def interpolate(self, alpha: float):
+        """Draw the character between the previous tick and the current one."""
+        (x1, y1), (x2, y2) = self._prev_position, self._position
+        x, y = round(x1 + (x2 - x1) * alpha), round(y1 + (y2 - y1) * alpha)
+        if (x, y) != self.render_position:
+            self._move_sprites(x, y)
+
+    @traced
     def update(self, dt: float):
+        self._prev_position = self._position
         if self._state != CharacterState.FREEZE and (
             self._prev_state != self._state or self._prev_direction != self._direction
         ):
             state = self._prev_state = self._state.value
             direction = self._prev_direction = self._direction.value
-            self._char_sprite.image = char_anime[state][direction]
+            self._char_sprite.image = char_anime.get()[state][direction]
+        if self._state in (CharacterState.RUN, CharacterState.WALK) and self._room:
+            dx, dy = self._move_vec[self._direction]
+            if self._state == CharacterState.RUN:
+                dx, dy = dx * 2, dy * 2
+            self._position = self._room.sweep(self._position, (dx, dy))
+
+    def release_keys(self):
+        """Stop moving as if all keys were released, e.g. when the window
+        loses focus and the key release events would never come."""
+        self._runnable = False
         if self._state in (CharacterState.RUN, CharacterState.WALK):
-            dx = self._move_vec[self._direction] / 8
-            for _ in range(8):
-                if self._state == CharacterState.RUN:
-                    dp = dx * 2
-                else:
-                    dp = dx
-                prev_pos = Vec2(*self.position)
-                now_pos = prev_pos + dp
-                if self._room and self._room.allow_move(now_pos[:]):
-                    self.position = now_pos[:]
-                else:
-                    break
+            self._state = CharacterState.IDLE
 
     def on_key_press(self, symbol, modifiers):
         if self._state == CharacterState.FREEZE:
@@ -25,6 +25,10 @@ class CampfireEntity(EntityBase):
                 i += 1
 
     def _next_plot(self):
+        if self.room.message_box.revealing:
+            # The first press shows the whole text.
+            self.room.message_box.skip()
+            return
         if self._now_plot + 1 >= len(self.plots):
             self.room.character.state = CharacterState.IDLE
             self.room.key_hint_group.visible = self._show_hints
@@ -30,6 +30,7 @@ class WidgetFrame:
     def _on_reposition_handler(self, widget: WidgetBase):
         self.remove_widget(widget)
         self.add_widget(widget)
+        self._window.invalidate()
 
     def add_widget(self, *widgets: WidgetBase):
         for widget in widgets:
@@ -39,4 +39,18 @@ class ScissorGroup(Group):
         gl.glDisable(gl.GL_SCISSOR_TEST)
 
 
-__all__ = ("ScissorGroup",)
+class UniqueGroup(Group):
+    """A group which is never merged with others, so that it can be hidden on
+    its own.
+
+    Groups with the same order and parent are merged by default.
+    """
+
+    def __eq__(self, other: Group) -> bool:
+        return self is other
+
+    def __hash__(self) -> int:
+        return id(self)
+
+
+__all__ = "ScissorGroup", "UniqueGroup"
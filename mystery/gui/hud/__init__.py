@@ -1 +1,2 @@
 from mystery.gui.hud.keyhint import KeyHint
+from mystery.gui.hud.performance import PerformanceHUD
@@ -2,28 +2,34 @@ from typing import Optional
 
 from pyglet import clock
 from pyglet.graphics import Batch, Group
+from pyglet.image import TextureRegion
 from pyglet.shapes import Rectangle
 from pyglet.sprite import Sprite
 from pyglet.text import Label
 from pyglet.window import key
 
 from mystery import resmgr
+from mystery.resource.asset import asset
 from mystery.resource.manager import FONT_NAME
 
-key_image = {}
-for name in [
-    "escape",
-    "left",
-    "right",
-    "up",
-    "down",
-    "shift",
-    "space",
-    "f5",
-    "f11",
-    "x",
-]:
-    key_image[name] = resmgr.loader.image(f"textures/keys/{name}.png")
+
+@asset
+def key_image() -> dict[str, TextureRegion]:
+    images = {}
+    for name in [
+        "escape",
+        "left",
+        "right",
+        "up",
+        "down",
+        "shift",
+        "space",
+        "f5",
+        "f11",
+        "x",
+    ]:
+        images[name] = resmgr.atlas_image(f"textures/keys/{name}.png")
+    return images
 
 
 class KeyHint:
@@ -50,27 +56,27 @@ class KeyHint:
             group=self._shape_group,
         )
         self._key_move_north = Sprite(
-            key_image["up"], 38, 112, batch=batch, group=self._hint_group1
+            key_image.get()["up"], 38, 112, batch=batch, group=self._hint_group1
         )
         self._key_move_north.scale = 1.5
         self._key_move_west = Sprite(
-            key_image["left"], 15, 89, batch=batch, group=self._hint_group1
+            key_image.get()["left"], 15, 89, batch=batch, group=self._hint_group1
         )
         self._key_move_west.scale = 1.5
         self._key_move_south = Sprite(
-            key_image["down"], 38, 89, batch=batch, group=self._hint_group1
+            key_image.get()["down"], 38, 89, batch=batch, group=self._hint_group1
         )
         self._key_move_south.scale = 1.5
         self._key_move_east = Sprite(
-            key_image["right"], 61, 89, batch=batch, group=self._hint_group1
+            key_image.get()["right"], 61, 89, batch=batch, group=self._hint_group1
         )
         self._key_move_east.scale = 1.5
         self._key_run = Sprite(
-            key_image["shift"], 18, 52, batch=batch, group=self._hint_group1
+            key_image.get()["shift"], 18, 52, batch=batch, group=self._hint_group1
         )
         self._key_run.scale = 2
         self._key_interact = Sprite(
-            key_image["space"], 18, 15, batch=batch, group=self._hint_group1
+            key_image.get()["space"], 18, 15, batch=batch, group=self._hint_group1
         )
         self._key_interact.scale = 2
 
@@ -106,19 +112,19 @@ class KeyHint:
         )
 
         self._key_open = Sprite(
-            key_image["x"], 15, 126, batch=batch, group=self._hint_group2
+            key_image.get()["x"], 15, 126, batch=batch, group=self._hint_group2
         )
         self._key_open.scale = 2
         self._key_back = Sprite(
-            key_image["escape"], 15, 89, batch=batch, group=self._hint_group2
+            key_image.get()["escape"], 15, 89, batch=batch, group=self._hint_group2
         )
         self._key_back.scale = 2
         self._key_screenshot = Sprite(
-            key_image["f5"], 15, 52, batch=batch, group=self._hint_group2
+            key_image.get()["f5"], 15, 52, batch=batch, group=self._hint_group2
         )
         self._key_screenshot.scale = 2
         self._key_fullscreen = Sprite(
-            key_image["f11"], 15, 15, batch=batch, group=self._hint_group2
+            key_image.get()["f11"], 15, 15, batch=batch, group=self._hint_group2
         )
         self._key_fullscreen.scale = 2
 
@@ -0,0 +1,140 @@
+from time import perf_counter
+
+from pyglet.graphics import Batch, Group
+from pyglet.shapes import Line, Rectangle
+from pyglet.text import Label
+
+from mystery.performance import HISTORY_SIZE, PerformanceMonitor
+from mystery.resource.manager import FONT_NAME
+
+GREEN = (85, 170, 85, 255)
+RED = (204, 68, 68, 255)
+GRAPH_HEIGHT = 60
+BAR_WIDTH = 3
+PADDING = 10
+
+
+class PerformanceHUD:
+    """Show frame time, GPU time and draw calls of a `PerformanceMonitor`,
+    and ticks of the simulation of the scene if it has one.
+
+    It has a batch of its own and is drawn on top of everything else.
+    """
+
+    def __init__(self, window: "mystery.scene.GameWindow", monitor: PerformanceMonitor):
+        self._window = window
+        self._monitor = monitor
+        self._batch = Batch()
+        self._shape_group = Group(order=0)
+        self._graph_group = Group(order=1)
+        self._text_group = Group(order=2)
+        self._size = (0, 0)
+        self._last_update = 0.0
+
+        self._width = HISTORY_SIZE * BAR_WIDTH + 2 * PADDING
+        self._shape = Rectangle(
+            0,
+            0,
+            self._width,
+            0,
+            color=(89, 86, 82, 192),
+            batch=self._batch,
+            group=self._shape_group,
+        )
+        self._bars = [
+            Rectangle(0, 0, BAR_WIDTH, 0, batch=self._batch, group=self._graph_group)
+            for _ in range(HISTORY_SIZE)
+        ]
+        self._budget_line = Line(
+            0,
+            0,
+            0,
+            0,
+            color=(255, 255, 255, 128),
+            batch=self._batch,
+            group=self._graph_group,
+        )
+        self._label = Label(
+            font_name=FONT_NAME,
+            font_size=10,
+            width=self._width - 2 * PADDING,
+            multiline=True,
+            anchor_x="left",
+            anchor_y="top",
+            batch=self._batch,
+            group=self._text_group,
+        )
+
+    @property
+    def _budget(self) -> float:
+        return 1 / self._window.setting["fps"]
+
+    def _layout(self):
+        width, height = self._window.get_size()
+        x = width - self._width - PADDING
+        self._label.position = (x + PADDING, height - PADDING, 0)
+        graph_y = height - PADDING - self._label.content_height - GRAPH_HEIGHT - 20
+        self._shape.position = (x, graph_y - PADDING)
+        self._shape.height = height - graph_y + PADDING
+        for i, bar in enumerate(self._bars):
+            bar.position = (x + PADDING + i * BAR_WIDTH, graph_y)
+        # Frames which reach the line miss the frame rate.
+        budget_y = graph_y + GRAPH_HEIGHT // 2
+        self._budget_line.position = (x + PADDING, budget_y)
+        self._budget_line.x2 = x + PADDING + HISTORY_SIZE * BAR_WIDTH
+        self._budget_line.y2 = budget_y
+
+    def _update_text(self):
+        frame_times = self._monitor.frame_times
+        last = frame_times[-1] if frame_times else 0
+        average = sum(frame_times) / max(len(frame_times), 1)
+        lines = [
+            f"CPU {last * 1000:5.2f} ms  avg {average * 1000:5.2f}  "
+            f"max {max(frame_times, default=0) * 1000:5.2f}",
+            f"{'batch':<10}{'GPU ms':>8}{'calls':>7}{'vertices':>10}",
+        ]
+        total_calls = total_vertices = 0
+        for name, (gpu_time, calls, vertices) in self._monitor.batch_stats().items():
+            lines.append(f"{name:<10}{gpu_time * 1000:8.3f}{calls:7}{vertices:10}")
+            total_calls += calls
+            total_vertices += vertices
+        lines.append(f"{'total':<10}{'':>8}{total_calls:7}{total_vertices:10}")
+        simulation = getattr(self._window.current_scene, "simulation", None)
+        if simulation is not None:
+            stats = simulation.stats
+            lines.append(
+                f"tick {stats['tick_time'] * 1000:5.2f} ms  "
+                f"{stats['ticks_per_frame']:4.2f}/frame  "
+                f"skipped {stats['skipped_ticks']}"
+            )
+        self._label.text = "\n".join(lines)
+
+    def draw(self):
+        now = perf_counter()
+        # Text is only updated 4 times a second, so that it can be read.
+        if now - self._last_update > 0.25:
+            self._last_update = now
+            self._update_text()
+            self._size = (0, 0)
+        if self._size != (size := self._window.get_size()):
+            self._size = size
+            self._layout()
+        budget = self._budget
+        frame_times = self._monitor.frame_times
+        offset = HISTORY_SIZE - len(frame_times)
+        for bar in self._bars[:offset]:
+            bar.height = 0
+        for bar, frame_time in zip(self._bars[offset:], frame_times):
+            bar.height = min(frame_time / (2 * budget), 1) * GRAPH_HEIGHT
+            bar.color = GREEN if frame_time <= budget else RED
+        self._batch.draw()
+
+    def delete(self):
+        self._shape.delete()
+        for bar in self._bars:
+            bar.delete()
+        self._budget_line.delete()
+        self._label.delete()
+
+
+__all__ = ("PerformanceHUD",)
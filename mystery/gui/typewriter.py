@@ -0,0 +1,94 @@
+from pyglet import clock
+from pyglet.event import EventDispatcher
+from pyglet.text import Label
+
+# How many characters are revealed a second by default.
+REVEAL_SPEED = 40
+
+
+class Typewriter(EventDispatcher):
+    """Reveal the text of a label character by character.
+
+    The label is laid out only once. Every glyph has 4 vertices, whose
+    `visible` attribute is cleared at first and set again when the glyph is
+    revealed, so a step only writes to the vertices of the new glyphs. The
+    vertices are private to pyglet 2.0, see `Typewriter.start`.
+    """
+
+    def __init__(self, speed: float = REVEAL_SPEED):
+        # Characters a second, or 0 to reveal the whole text at once.
+        self.speed = speed
+        # (vertex list, index of the glyph in it) of every glyph in order.
+        self._glyphs = []
+        self._shown = 0
+        self._progress = 0.0
+
+    @property
+    def revealing(self) -> bool:
+        """Whether some of the text is still hidden."""
+        return self._shown < len(self._glyphs)
+
+    @property
+    def shown(self) -> int:
+        """How many glyphs are revealed."""
+        return self._shown
+
+    def start(self, label: Label, shown: int = 0):
+        """Hide the text of `label` and start revealing it, with the first
+        `shown` glyphs revealed at once."""
+        self.reset()
+        # `TextLayout._vertex_lists` is private to pyglet, but it is the only
+        # way to hide glyphs without laying the text out again. It is safe
+        # with the version pinned by `mystery._check_dependencies`, and the
+        # whole text is shown at once if another version does not have it.
+        vertex_lists = getattr(label, "_vertex_lists", ())
+        if not all(hasattr(vertex_list, "visible") for vertex_list in vertex_lists):
+            return
+        for vertex_list in vertex_lists:
+            vertex_list.visible[:] = (0.0,) * vertex_list.count
+            self._glyphs.extend((vertex_list, i) for i in range(vertex_list.count // 4))
+        if self.speed > 0:
+            clock.schedule_interval(self._type, 1 / 60)
+            self._progress = float(min(shown, len(self._glyphs)))
+            self._reveal(int(self._progress))
+        else:
+            self.skip()
+
+    def stop(self):
+        """Stop revealing, and leave the text as it is."""
+        clock.unschedule(self._type)
+
+    def reset(self):
+        """Stop revealing, and forget the label, which may be deleted then."""
+        self.stop()
+        self._glyphs = []
+        self._shown = 0
+        self._progress = 0.0
+
+    def skip(self):
+        """Reveal the whole text at once."""
+        self._reveal(len(self._glyphs))
+
+    def _type(self, dt: float):
+        self._progress += dt * self.speed
+        self._reveal(min(int(self._progress), len(self._glyphs)))
+
+    def _reveal(self, count: int):
+        i = self._shown
+        while i < count:
+            # Glyphs in the same vertex list are revealed at once.
+            vertex_list, first = self._glyphs[i]
+            last = min(first + count - i, vertex_list.count // 4)
+            vertex_list.visible[first * 4 : last * 4] = (1.0,) * (4 * (last - first))
+            i += last - first
+        if count != self._shown:
+            self._shown = count
+            self.dispatch_event("on_reveal")
+        if not self.revealing:
+            self.stop()
+
+
+Typewriter.register_event_type("on_reveal")
+
+
+__all__ = "REVEAL_SPEED", "Typewriter"
@@ -1,18 +1,24 @@
 from typing import Optional
 
 from pyglet.graphics import Batch, Group
+from pyglet.image import TextureRegion
 from pyglet.sprite import Sprite
 
 from mystery import resmgr
 from mystery.gui.groups import ScissorGroup
 from mystery.gui.widgets import WidgetBase
+from mystery.resource.asset import asset
 
-pages_texture = []
-for i in range(1, 8):
-    page_img = resmgr.loader.image(f"textures/gui/book/flip_pages_{i}.png")
-    page_img.anchor_x = page_img.width // 2
-    page_img.anchor_y = page_img.height // 2
-    pages_texture.append(page_img)
+
+@asset
+def pages_texture() -> list[TextureRegion]:
+    textures = []
+    for i in range(1, 8):
+        page_img = resmgr.atlas_image(f"textures/gui/book/flip_pages_{i}.png")
+        page_img.anchor_x = page_img.width // 2
+        page_img.anchor_y = page_img.height // 2
+        textures.append(page_img)
+    return textures
 
 
 class Book(WidgetBase):
@@ -31,7 +37,7 @@ class Book(WidgetBase):
 
         self.page_group = Group(order=0, parent=group)
         self.page = Sprite(
-            img=pages_texture[0],
+            img=pages_texture.get()[0],
             x=self._window.width // 2,
             y=self._window.height // 2,
             batch=batch,
@@ -2,7 +2,7 @@ from math import ceil, floor
 from typing import Optional
 
 from pyglet.graphics import Batch, Group
-from pyglet.image import AbstractImage
+from pyglet.image import AbstractImage, TextureRegion
 from pyglet.sprite import Sprite
 from pyglet.text import Label
 from pyglet.window import mouse
@@ -10,27 +10,29 @@ from pyglet.window import mouse
 from mystery import resmgr
 from mystery.gui.patch import ThreePatch
 from mystery.gui.widgets import WidgetBase
-from mystery.resource import texture_region
+from mystery.resource.asset import asset
 from mystery.resource.manager import FONT_NAME
 
 WHITE = (255, 255, 255, 255)
 GRAY = (170, 170, 170, 255)
-button_texture = resmgr.loader.image("textures/gui/widgets/buttons.png")
-decorated_button_texture = resmgr.loader.image(
-    "textures/gui/widgets/frame_decorations.png"
-)
-button_image = {"normal": [], "hover": [], "pressed": []}
-decorated_button_image = {"normal": [], "pressed": []}
-for i in ["normal", "hover", "pressed"]:
-    for j in "lmr":
-        region_name = f"b{i[0]}{j}"
-        button_image[i].append(button_texture.get_region(*texture_region[region_name]))
-        if i == "hover":
-            continue
-        region_name = f"fdb{i[0]}{j}"
-        decorated_button_image[i].append(
-            decorated_button_texture.get_region(*texture_region[region_name])
-        )
+
+
+@asset
+def button_image() -> dict[str, list[TextureRegion]]:
+    images = {"normal": [], "hover": [], "pressed": []}
+    for i in images:
+        for j in "lmr":
+            images[i].append(resmgr.region(f"b{i[0]}{j}"))
+    return images
+
+
+@asset
+def decorated_button_image() -> dict[str, list[TextureRegion]]:
+    images = {"normal": [], "pressed": []}
+    for i in images:
+        for j in "lmr":
+            images[i].append(resmgr.region(f"fdb{i[0]}{j}"))
+    return images
 
 
 class DecoratedButton(WidgetBase):
@@ -53,7 +55,7 @@ class DecoratedButton(WidgetBase):
             self._y,
             self._width,
             self._height,
-            *decorated_button_image["normal"],
+            *decorated_button_image.get()["normal"],
             batch=batch,
             group=self._button_group,
         )
@@ -112,14 +114,14 @@ class DecoratedButton(WidgetBase):
     def on_mouse_press(self, x, y, buttons, modifiers):
         if not self._enabled or not self._check_hit(x, y) or not buttons & mouse.LEFT:
             return
-        self._button[:] = decorated_button_image["pressed"]
+        self._button[:] = decorated_button_image.get()["pressed"]
         self._pressed = True
 
     def on_mouse_release(self, x, y, buttons, modifiers):
         if not self._enabled or not self._pressed:
             return
         self._label.color = GRAY if self._check_hit(x, y) else WHITE
-        self._button[:] = decorated_button_image["normal"]
+        self._button[:] = decorated_button_image.get()["normal"]
         self._pressed = False
         self.dispatch_event("on_click")
 
@@ -127,13 +129,13 @@ class DecoratedButton(WidgetBase):
         if not self._enabled or self._pressed:
             return
         self._label.color = GRAY if self._check_hit(x, y) else WHITE
-        self._button[:] = decorated_button_image["normal"]
+        self._button[:] = decorated_button_image.get()["normal"]
 
     def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
         if not self._enabled or self._pressed:
             return
         self._label.color = GRAY if self._check_hit(x, y) else WHITE
-        self._button[:] = decorated_button_image["normal"]
+        self._button[:] = decorated_button_image.get()["normal"]
 
 
 DecoratedButton.register_event_type("on_click")
@@ -161,7 +163,7 @@ class TextButton(WidgetBase):
             self._y,
             self._width,
             self._height,
-            *button_image["normal"],
+            *button_image.get()["normal"],
             batch=batch,
             group=self._button_group,
         )
@@ -205,10 +207,10 @@ class TextButton(WidgetBase):
 
     def _set_enabled(self, enabled: bool):
         if enabled:
-            self._button[:] = button_image["normal"]
+            self._button[:] = button_image.get()["normal"]
             self._label.color = WHITE
         else:
-            self._button[:] = button_image["pressed"]
+            self._button[:] = button_image.get()["pressed"]
             self._label.color = GRAY
 
     def _update_position(self):
@@ -227,7 +229,7 @@ class TextButton(WidgetBase):
     def on_mouse_press(self, x, y, buttons, modifiers):
         if not self._enabled or not self._check_hit(x, y) or not buttons & mouse.LEFT:
             return
-        self._button[:] = button_image["pressed"]
+        self._button[:] = button_image.get()["pressed"]
         self._pressed = True
 
     def on_mouse_release(self, x, y, buttons, modifiers):
@@ -235,7 +237,7 @@ class TextButton(WidgetBase):
             return
         self._label.color = GRAY if self._check_hit(x, y) else WHITE
         status = "hover" if self._check_hit(x, y) else "normal"
-        self._button[:] = button_image[status]
+        self._button[:] = button_image.get()[status]
         self._pressed = False
         self.dispatch_event("on_click")
 
@@ -244,14 +246,14 @@ class TextButton(WidgetBase):
             return
         self._label.color = GRAY if self._check_hit(x, y) else WHITE
         status = "hover" if self._check_hit(x, y) else "normal"
-        self._button[:] = button_image[status]
+        self._button[:] = button_image.get()[status]
 
     def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
         if not self._enabled or self._pressed:
             return
         self._label.color = GRAY if self._check_hit(x, y) else WHITE
         status = "hover" if self._check_hit(x, y) else "normal"
-        self._button[:] = button_image[status]
+        self._button[:] = button_image.get()[status]
 
 
 TextButton.register_event_type("on_click")
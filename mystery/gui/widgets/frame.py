@@ -2,6 +2,7 @@ from math import dist
 from typing import Optional
 
 from pyglet.graphics import Batch, Group
+from pyglet.image import TextureRegion
 from pyglet.sprite import Sprite
 from pyglet.text import Label
 from pyglet.window import mouse
@@ -9,27 +10,41 @@ from pyglet.window import mouse
 from mystery import resmgr
 from mystery.gui.patch import NinePatch
 from mystery.gui.widgets import WidgetBase
-from mystery.resource import texture_region
+from mystery.resource.asset import asset
 from mystery.resource.manager import FONT_NAME
 
-frame_texture = resmgr.loader.image("textures/gui/widgets/frames.png")
-button_and_icon_texture = resmgr.loader.image(
-    "textures/gui/widgets/round_buttons_and_icons.png"
-)
-icon_image = button_and_icon_texture.get_region(*texture_region["icon.close"])
-button_image = {}
-for status in ["normal", "hover", "pressed"]:
-    button_image[status] = button_and_icon_texture.get_region(
-        *texture_region[f"rb{status[0]}.red"]
-    )
-advanced_frame_image = []
-simple_frame_image = []
-for i in "tmb":
-    for j in "lmr":
-        region = f"sft{j}2" if i == "t" else f"f{i}{j}"
-        advanced_frame_image.append(frame_texture.get_region(*texture_region[region]))
-        region = f"sft{j}1" if i == "t" else f"f{i}{j}"
-        simple_frame_image.append(frame_texture.get_region(*texture_region[region]))
+
+@asset
+def icon_image() -> TextureRegion:
+    return resmgr.region("icon.close")
+
+
+@asset
+def button_image() -> dict[str, TextureRegion]:
+    images = {}
+    for status in ["normal", "hover", "pressed"]:
+        images[status] = resmgr.region(f"rb{status[0]}.red")
+    return images
+
+
+@asset
+def advanced_frame_image() -> list[TextureRegion]:
+    images = []
+    for i in "tmb":
+        for j in "lmr":
+            region = f"sft{j}2" if i == "t" else f"f{i}{j}"
+            images.append(resmgr.region(region))
+    return images
+
+
+@asset
+def simple_frame_image() -> list[TextureRegion]:
+    images = []
+    for i in "tmb":
+        for j in "lmr":
+            region = f"sft{j}1" if i == "t" else f"f{i}{j}"
+            images.append(resmgr.region(region))
+    return images
 
 
 class AdvancedFrame(WidgetBase):
@@ -52,17 +67,19 @@ class AdvancedFrame(WidgetBase):
         self._widgets_group = Group(order=1, parent=group)
         self._icon_group = Group(order=2, parent=group)
         self._button_sprite = Sprite(
-            button_image["normal"], batch=batch, group=self._widgets_group
+            button_image.get()["normal"], batch=batch, group=self._widgets_group
         )
         self._button_sprite.scale = 2
-        self._icon_sprite = Sprite(icon_image, batch=batch, group=self._icon_group)
+        self._icon_sprite = Sprite(
+            icon_image.get(), batch=batch, group=self._icon_group
+        )
         self._icon_sprite.scale = 2
         self._frame = NinePatch(
             self._x,
             self._y,
             self._width,
             self._height,
-            *advanced_frame_image,
+            *advanced_frame_image.get(),
             batch=batch,
             group=self._frame_group,
         )
@@ -129,27 +146,27 @@ class AdvancedFrame(WidgetBase):
         if not self._check_hit(x, y) or not buttons & mouse.LEFT:
             return
         self._pressed = True
-        self._button_sprite.image = button_image["pressed"]
+        self._button_sprite.image = button_image.get()["pressed"]
 
     def on_mouse_release(self, x, y, buttons, modifiers):
         if not self._pressed:
             return
         self._pressed = False
         status = "hover" if self._check_hit(x, y) else "normal"
-        self._button_sprite.image = button_image[status]
+        self._button_sprite.image = button_image.get()[status]
         self.dispatch_event("on_button_click")
 
     def on_mouse_motion(self, x, y, dx, dy):
         if self._pressed:
             return
         status = "hover" if self._check_hit(x, y) else "normal"
-        self._button_sprite.image = button_image[status]
+        self._button_sprite.image = button_image.get()[status]
 
     def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
         if self._pressed:
             return
         status = "hover" if self._check_hit(x, y) else "normal"
-        self._button_sprite.image = button_image[status]
+        self._button_sprite.image = button_image.get()[status]
 
 
 AdvancedFrame.register_event_type("on_button_click")
@@ -173,7 +190,7 @@ class SimpleFrame(WidgetBase):
             self._y,
             self._width,
             self._height,
-            *simple_frame_image,
+            *simple_frame_image.get(),
             batch=batch,
             group=group,
         )
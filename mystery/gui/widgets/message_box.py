@@ -1,20 +1,37 @@
+from collections import OrderedDict
+from functools import lru_cache
 from math import ceil, floor
 from typing import Optional
 
 from pyglet.graphics import Batch, Group
+from pyglet.image import TextureRegion
 from pyglet.sprite import Sprite
 from pyglet.text import Label
 
 from mystery import resmgr, utils
+from mystery.gui.groups import UniqueGroup
 from mystery.gui.patch import ThreePatch
+from mystery.gui.typewriter import Typewriter
 from mystery.gui.widgets import WidgetBase
-from mystery.resource import texture_region
+from mystery.resource.asset import asset
 from mystery.resource.manager import FONT_NAME
+from mystery.trace import traced
 
-mb_texture = resmgr.loader.image("textures/gui/message_box.png")
-mb_images = []
-for i in "lmr":
-    mb_images.append(mb_texture.get_region(*texture_region[f"mb{i}"]))
+# How many laid out texts a message box keeps.
+LAYOUT_CACHE_SIZE = 16
+FONT_SIZE = 18
+
+
+@asset
+def mb_images() -> list[TextureRegion]:
+    return [resmgr.region(f"mb{i}") for i in "lmr"]
+
+
+@lru_cache(maxsize=256)
+def _wrap_cached(text: str, width: int, font_size: int, language: str) -> str:
+    # `language` is only a part of the key, since `line_break_func` depends
+    # on the language being used.
+    return utils.line_break_func(text, width, font_size)
 
 
 class MessageBox(WidgetBase):
@@ -30,6 +47,7 @@ class MessageBox(WidgetBase):
         super().__init__(x, y, width, height)
 
         self._text = ""
+        self._batch = batch
         self._back_group = Group(order=0, parent=group)
         self._fore_group = Group(order=1, parent=group)
         self._message = ThreePatch(
@@ -37,18 +55,16 @@ class MessageBox(WidgetBase):
             self._y,
             self._width,
             self._height,
-            *mb_images,
+            *mb_images.get(),
             batch=batch,
             group=self._back_group,
         )
-        self._label = Label(
-            font_name=FONT_NAME,
-            font_size=18,
-            width=self._width - 40,
-            multiline=True,
-            batch=batch,
-            group=self._fore_group,
-        )
+        # Laid out texts, whose groups are hidden unless they are shown. The
+        # key is (text, width, font size, language).
+        self._layouts: OrderedDict[tuple, tuple[UniqueGroup, Label]] = OrderedDict()
+        self._layout = None
+        self._typewriter = Typewriter(self._window.setting["text_speed"])
+        self._typewriter.push_handlers(on_reveal=self._on_reveal)
         self._update_position()
 
     @property
@@ -60,7 +76,9 @@ class MessageBox(WidgetBase):
         self._back_group = Group(order=0, parent=group)
         self._fore_group = Group(order=1, parent=group)
         self._message.group = self._back_group
-        self._label.group = self._fore_group
+        shown = self._shown()
+        self._clear_layouts()
+        self._relayout(shown)
 
     @property
     def text(self) -> str:
@@ -69,24 +87,107 @@ class MessageBox(WidgetBase):
     @text.setter
     def text(self, value: str):
         self._text = value
-        self._label.text = utils.line_break_func(self._text, self._label.width)
+        self._relayout()
+
+    @property
+    def reveal_speed(self) -> float:
+        """Characters revealed a second, or 0 to show texts at once."""
+        return self._typewriter.speed
+
+    @reveal_speed.setter
+    def reveal_speed(self, speed: float):
+        self._typewriter.speed = speed
+
+    @property
+    def revealing(self) -> bool:
+        """Whether the text is still being revealed."""
+        return self._typewriter.revealing
+
+    def skip(self):
+        """Show the whole text at once."""
+        self._typewriter.skip()
+
+    def _on_reveal(self):
+        self._window.invalidate()
+
+    @property
+    def _label_width(self) -> int:
+        return self._width - 40
+
+    def _create_layout(self, key: tuple) -> tuple[UniqueGroup, Label]:
+        text, width, font_size, language = key
+        group = UniqueGroup(parent=self._fore_group)
+        group.visible = False
+        label = Label(
+            _wrap_cached(text, width, font_size, language),
+            font_name=FONT_NAME,
+            font_size=font_size,
+            x=self._x + 20,
+            y=78 * 2 - 25,
+            width=width,
+            multiline=True,
+            batch=self._batch,
+            group=group,
+        )
+        return group, label
+
+    def _shown(self) -> Optional[int]:
+        # Glyphs revealed so far, or None if the whole text is shown.
+        return self._typewriter.shown if self._typewriter.revealing else None
+
+    @traced
+    def _relayout(self, shown: Optional[int] = 0):
+        # `shown` glyphs are revealed at once, or all of them if it is None.
+        # The label may be deleted below, so the typewriter forgets it first.
+        self._typewriter.reset()
+        if self._layout is not None:
+            self._layout[0].visible = False
+            self._layout = None
+        if self._text == "":
+            return
+        language = self._window.resource.language
+        key = (self._text, self._label_width, FONT_SIZE, language)
+        if key in self._layouts:
+            self._layouts.move_to_end(key)
+        else:
+            self._layouts[key] = self._create_layout(key)
+            if len(self._layouts) > LAYOUT_CACHE_SIZE:
+                _, (_, label) = self._layouts.popitem(last=False)
+                label.delete()
+        self._layout = self._layouts[key]
+        self._layout[0].visible = True
+        self._typewriter.start(self._layout[1], shown or 0)
+        if shown is None:
+            self._typewriter.skip()
+
+    def _clear_layouts(self):
+        self._typewriter.reset()
+        for _, label in self._layouts.values():
+            label.delete()
+        self._layouts.clear()
+        self._layout = None
 
     def _update_position(self):
         self._message.x = self._x
         self._message.y = self._y
         self._message.width = self._width
         self._message.height = self._height
-        self._label.position = (self._x + 20, 78 * 2 - 25, 0)
-        self._label.width = self._width - 40
+        for _, label in self._layouts.values():
+            label.position = (self._x + 20, 78 * 2 - 25, 0)
 
     def draw(self):
         self._message.draw()
-        self._label.draw()
+        if self._layout is not None:
+            self._layout[1].draw()
 
     def resize(self):
-        self.width, self.height = self._window.width - 20, 78 * 2
-        text = utils.line_break_func(self._text, self._label.width)
-        self._label.text = text
+        width = self._window.width - 20
+        shown = self._shown()
+        if width != self._width:
+            # Texts laid out in other widths are not used any more.
+            self._clear_layouts()
+        self.width, self.height = width, 78 * 2
+        self._relayout(shown)
 
 
 __all__ = ("MessageBox",)
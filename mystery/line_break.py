@@ -0,0 +1,124 @@
+from collections.abc import Callable
+from functools import lru_cache
+from itertools import accumulate
+from unicodedata import east_asian_width
+
+# Classes of characters, a small subset of those in UAX #14.
+AL, SP, BK, OP, CL, NS, HY = range(7)
+# Opening punctuation, after which a line must not break.
+OPENING = "([{（［｛「『【〔〈《〖〘〚‘“"
+# Closing punctuation, which must not start a line.
+CLOSING = ")]}）］｝」』】〕〉》〗〙〛’”,.:;!?、。，．：；！？・…‥〜～"
+# Small kana and iteration marks, which only strict rules keep from starting
+# a line.
+NON_STARTER = "ぁぃぅぇぉっゃゅょゎゕゖァィゥェォッャュョヮヵヶー々ゝゞヽヾ"
+
+
+@lru_cache(maxsize=4096)
+def break_class(char: str) -> tuple[int, bool]:
+    """Get the class of `char`, and whether it is wide like ideographs.
+
+    A line may break before and after a wide character unless kinsoku rules
+    forbid it.
+    """
+    wide = east_asian_width(char) in "FW"
+    if char == "\n":
+        return BK, False
+    elif char == " ":
+        return SP, False
+    elif char in OPENING:
+        return OP, wide
+    elif char in CLOSING:
+        return CL, wide
+    elif char in NON_STARTER:
+        return NS, wide
+    elif char == "-":
+        return HY, False
+    return AL, wide
+
+
+def _can_break(prev: tuple[int, bool], this: tuple[int, bool], strict: bool) -> bool:
+    # Whether a line can break between two characters of these classes.
+    (prev_class, prev_wide), (this_class, this_wide) = prev, this
+    if this_class in (SP, CL) or (strict and this_class == NS):
+        return False
+    elif prev_class == OP:
+        return False
+    elif prev_class == SP or prev_wide or this_wide:
+        return True
+    return prev_class == HY and this_class == AL
+
+
+class GlyphAdvances(dict):
+    """The advance of every character in a font, loaded when first used."""
+
+    def __init__(self, font_name: str, font_size: int):
+        super().__init__()
+        from pyglet.font import load
+
+        self._font = load(font_name, font_size)
+
+    def __missing__(self, char: str) -> float:
+        advance = self[char] = sum(g.advance for g in self._font.get_glyphs(char))
+        return advance
+
+
+@lru_cache(maxsize=8)
+def glyph_advances(font_size: int) -> GlyphAdvances:
+    """Get the advances of the game font at `font_size`."""
+    from mystery.resource.manager import FONT_NAME
+
+    return GlyphAdvances(FONT_NAME, font_size)
+
+
+def break_lines(
+    text: str,
+    line_width: float,
+    advance: Callable[[str], float],
+    strict: bool = False,
+) -> list[str]:
+    """Break `text` into lines which are not wider than `line_width`.
+
+    Lines are broken greedily at the last break opportunity that fits, so it
+    takes linear time. `strict` applies strict kinsoku rules. Spaces at the
+    end of lines are removed and do not count towards the width.
+    """
+    widths = [0.0]
+    widths.extend(accumulate(advance(char) for char in text))
+    classes = [break_class(char) for char in text]
+    lines = []
+    start = 0
+    # The last position before which the line can break.
+    opportunity = 0
+    for i, (char_class, _) in enumerate(classes):
+        if char_class == BK:
+            lines.append(text[start:i].rstrip(" "))
+            start = opportunity = i + 1
+            continue
+        if i > start and _can_break(classes[i - 1], classes[i], strict):
+            opportunity = i
+        if char_class == SP or widths[i + 1] - widths[start] <= line_width:
+            continue
+        if opportunity > start:
+            end = opportunity
+        elif i > start:
+            # Nowhere to break, e.g. a long word. Break before the character
+            # which overflows.
+            end = i
+        else:
+            continue
+        lines.append(text[start:end].rstrip(" "))
+        start = end
+        if i > start and widths[i + 1] - widths[start] > line_width:
+            lines.append(text[start:i])
+            start = i
+    lines.append(text[start:].rstrip(" "))
+    return lines
+
+
+__all__ = (
+    "break_class",
+    "GlyphAdvances",
+    "glyph_advances",
+    "break_lines",
+)
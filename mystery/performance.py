@@ -0,0 +1,149 @@
+from collections import deque
+from ctypes import byref
+from time import perf_counter
+
+from pyglet import gl
+from pyglet.graphics import Batch
+
+# How many frames are kept for the frame time graph.
+HISTORY_SIZE = 120
+
+
+def batch_stats(batch: Batch) -> tuple[int, int]:
+    """Get the number of draw calls and vertices of a batch.
+
+    Only visible groups are counted, like `Batch.draw` does. Every vertex
+    domain is drawn by one call of `glMultiDraw*`.
+    """
+    draw_calls = vertices = 0
+    groups = [group for group in batch.top_groups if group.visible]
+    while groups:
+        group = groups.pop()
+        for domain in batch.group_map.get(group, {}).values():
+            if domain.is_empty:
+                continue
+            draw_calls += 1
+            vertices += sum(domain.allocator.get_allocated_regions()[1])
+        for child in batch.group_children.get(group, ()):
+            if child.visible:
+                groups.append(child)
+    return draw_calls, vertices
+
+
+class GPUTimer:
+    """Measure how long the GPU takes to draw something.
+
+    The results of `GL_TIME_ELAPSED` queries are read a few frames later, so
+    that the CPU never waits for the GPU.
+    """
+
+    def __init__(self):
+        self._free: list[int] = []
+        self._pending: deque[int] = deque()
+        self._time = 0.0
+
+    @property
+    def time(self) -> float:
+        """The latest time measured in seconds."""
+        return self._time
+
+    def begin(self):
+        if self._free:
+            query = self._free.pop()
+        else:
+            query = gl.GLuint()
+            gl.glGenQueries(1, byref(query))
+            query = query.value
+        gl.glBeginQuery(gl.GL_TIME_ELAPSED, query)
+        self._pending.append(query)
+
+    def end(self):
+        gl.glEndQuery(gl.GL_TIME_ELAPSED)
+
+    def poll(self):
+        available = gl.GLint()
+        result = gl.GLuint64()
+        while self._pending:
+            query = self._pending[0]
+            gl.glGetQueryObjectiv(query, gl.GL_QUERY_RESULT_AVAILABLE, byref(available))
+            if not available.value:
+                break
+            gl.glGetQueryObjectui64v(query, gl.GL_QUERY_RESULT, byref(result))
+            self._time = result.value / 1e9
+            self._free.append(self._pending.popleft())
+
+    def delete(self):
+        queries = self._free + list(self._pending)
+        if queries:
+            gl.glDeleteQueries(len(queries), (gl.GLuint * len(queries))(*queries))
+        self._free.clear()
+        self._pending.clear()
+
+
+class PerformanceMonitor:
+    """Collect the time spent by frames and the batches drawn by them.
+
+    Batches should be drawn by `draw`, which only measures them when the
+    monitor is enabled.
+    """
+
+    def __init__(self):
+        self._enabled = False
+        self._frame_start = 0.0
+        self._frame_times: deque[float] = deque(maxlen=HISTORY_SIZE)
+        self._timers: dict[str, GPUTimer] = {}
+        self._batches: dict[str, Batch] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._enabled = value
+        if not value:
+            for timer in self._timers.values():
+                timer.delete()
+            self._timers.clear()
+            self._batches.clear()
+            self._frame_times.clear()
+
+    @property
+    def frame_times(self) -> deque[float]:
+        """CPU time of the latest frames in seconds."""
+        return self._frame_times
+
+    def begin_frame(self):
+        if self._enabled:
+            self._frame_start = perf_counter()
+            # Batches which are not drawn any more are forgotten.
+            self._batches.clear()
+
+    def end_frame(self):
+        if self._enabled:
+            self._frame_times.append(perf_counter() - self._frame_start)
+            for timer in self._timers.values():
+                timer.poll()
+
+    def draw(self, name: str, batch: Batch):
+        """Draw `batch`, which is called `name` in the statistics."""
+        if not self._enabled:
+            batch.draw()
+            return
+        if (timer := self._timers.get(name)) is None:
+            timer = self._timers[name] = GPUTimer()
+        self._batches[name] = batch
+        timer.begin()
+        batch.draw()
+        timer.end()
+
+    def batch_stats(self) -> dict[str, tuple[float, int, int]]:
+        """Get GPU time, draw calls and vertices of batches drawn last frame."""
+        stats = {}
+        for name, batch in self._batches.items():
+            draw_calls, vertices = batch_stats(batch)
+            stats[name] = (self._timers[name].time, draw_calls, vertices)
+        return stats
+
+
+__all__ = "HISTORY_SIZE", "batch_stats", "GPUTimer", "PerformanceMonitor"
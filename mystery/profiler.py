@@ -0,0 +1,185 @@
+import sys
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Optional
+
+
+class _TimedLoader:
+    """Wrap the loader of a module to time how long it takes to execute.
+
+    The loader of a spec may be shared by many modules, e.g. a `zipimporter`
+    loads every module in a zip file, so it is wrapped for a spec instead of
+    being changed.
+    """
+
+    def __init__(self, timer: "_ImportTimer", loader):
+        self._timer = timer
+        self._loader = loader
+
+    def __getattr__(self, name: str):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # The module only sees its real loader.
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._timer.exec_module(self._loader, module)
+
+
+class _ImportTimer:
+    """A meta path finder which times how long every module takes to import.
+
+    It finds modules with the other finders and only wraps their loaders, so
+    modules are loaded exactly as usual.
+    """
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+        # [name, start time, traced memory, time of children]
+        self._stack: list[list] = []
+        self._specs = []
+
+    def find_spec(self, fullname: str, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        loader = spec.loader
+        # Built-in and frozen modules are loaded by classes, whose modules are
+        # created in a different way.
+        if loader is None or isinstance(loader, type):
+            return spec
+        if not hasattr(loader, "exec_module"):
+            return spec
+        spec.loader = _TimedLoader(self, loader)
+        self._specs.append(spec)
+        return spec
+
+    def remove(self):
+        """Stop timing, and put back the loaders of modules not loaded yet."""
+        sys.meta_path.remove(self)
+        for spec in self._specs:
+            if isinstance(spec.loader, _TimedLoader):
+                spec.loader = spec.loader._loader
+        self._specs.clear()
+
+    def exec_module(self, loader, module):
+        self._stack.append([module.__name__, perf_counter(), _traced(), 0.0])
+        try:
+            loader.exec_module(module)
+        finally:
+            name, start, memory, children = self._stack.pop()
+            time = perf_counter() - start
+            if self._stack:
+                self._stack[-1][3] += time
+            self._profiler.modules.append(
+                {
+                    "name": name,
+                    "time": time,
+                    "self_time": time - children,
+                    "allocated": _traced() - memory,
+                }
+            )
+
+
+def _traced() -> int:
+    import tracemalloc
+
+    return tracemalloc.get_traced_memory()[0]
+
+
+class StartupProfiler:
+    """Record the time and memory spent by each phase of the startup.
+
+    Nothing is recorded until `start` is called, so `phase` can be left in
+    the code for free.
+    """
+
+    def __init__(self):
+        self.phases: list[dict] = []
+        self.modules: list[dict] = []
+        self._enabled = False
+        self._start_time = 0.0
+        self._depth = 0
+        self._import_timer = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def start(self):
+        """Start profiling, which should be done before importing the game."""
+        if self._enabled:
+            return
+        self._enabled = True
+        # Imported here, since it is slow to import and rarely used.
+        import tracemalloc
+
+        tracemalloc.start()
+        self._import_timer = _ImportTimer(self)
+        sys.meta_path.insert(0, self._import_timer)
+        self._start_time = perf_counter()
+
+    def stop(self) -> dict:
+        """Stop profiling and return the report."""
+        if not self._enabled:
+            return {}
+        total = perf_counter() - self._start_time
+        import tracemalloc
+
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self._import_timer.remove()
+        self._import_timer = None
+        self._enabled = False
+        return {
+            "total": total,
+            "peak_memory": peak,
+            "phases": sorted(self.phases, key=lambda p: p["start"]),
+            "modules": sorted(self.modules, key=lambda m: m["time"], reverse=True),
+        }
+
+    def begin(self, name: str) -> Optional[tuple]:
+        """Begin a phase of the startup, which may be nested."""
+        if not self._enabled:
+            return None
+        self._depth += 1
+        return name, perf_counter(), _traced()
+
+    def end(self, token: Optional[tuple]):
+        """End a phase begun by `begin`."""
+        if token is None or not self._enabled:
+            return
+        name, start, memory = token
+        self._depth -= 1
+        self.phases.append(
+            {
+                "name": name,
+                "depth": self._depth,
+                "start": start - self._start_time,
+                "time": perf_counter() - start,
+                "allocated": _traced() - memory,
+            }
+        )
+
+    @contextmanager
+    def phase(self, name: str):
+        """Record a phase of the startup in a `with` block."""
+        token = self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(token)
+
+
+startup_profiler = StartupProfiler()
+
+__all__ = "StartupProfiler", "startup_profiler"
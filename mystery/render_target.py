@@ -0,0 +1,167 @@
+from contextlib import contextmanager
+from math import ceil
+
+from pyglet import gl
+from pyglet.graphics.shader import Shader, ShaderProgram
+from pyglet.image import Texture
+from pyglet.image.buffer import Framebuffer, Renderbuffer
+from pyglet.math import Mat4
+
+# The world is drawn at this size at least, which is the minimum window size.
+BASE_SIZE = (768, 576)
+# "native" draws the world straight into the window.
+SCALE_MODES = ("native", "integer", "sharp")
+
+vertex_source = """
+    #version 150 core
+    in vec2 position;
+    in vec2 tex_coords;
+    out vec2 texture_coords;
+
+    void main() {
+        gl_Position = vec4(position, 0.0, 1.0);
+        texture_coords = tex_coords;
+    }
+"""
+
+fragment_source = """
+    #version 150 core
+    in vec2 texture_coords;
+    out vec4 final_colors;
+
+    uniform sampler2D world_texture;
+    uniform vec2 texture_size;
+    uniform float scale;
+
+    void main() {
+        // Sharp bilinear: every texel is a block of `scale` pixels, and only
+        // pixels on the edges of the blocks are blended.
+        vec2 texel = texture_coords * texture_size;
+        vec2 center_dist = fract(texel) - 0.5;
+        vec2 region = vec2(0.5 - 0.5 / scale);
+        vec2 f = (center_dist - clamp(center_dist, -region, region)) * scale + 0.5;
+        vec2 coords = (floor(texel) + f) / texture_size;
+        final_colors = vec4(texture(world_texture, coords).rgb, 1.0);
+    }
+"""
+
+
+class WorldRenderTarget:
+    """An offscreen framebuffer which the world is drawn into.
+
+    The framebuffer is about `BASE_SIZE` whatever the size of the window,
+    then it is upscaled to fill the window. "integer" only scales by whole
+    numbers, while "sharp" scales by any number and blends the edges of
+    pixels, so that they have the same size.
+    """
+
+    def __init__(self, mode: str):
+        if mode not in SCALE_MODES[1:]:
+            raise ValueError(f"unknown scale mode '{mode}'")
+        self.mode = mode
+        self._window_size = (0, 0)
+        self._size = (0, 0)
+        self._scale = 1.0
+        self._framebuffer = None
+        self._texture = None
+        self._depth_buffer = None
+        # Compiled here rather than on import, since the "native" mode never
+        # needs it.
+        self._program = ShaderProgram(
+            Shader(vertex_source, "vertex"), Shader(fragment_source, "fragment")
+        )
+        self._vertex_list = self._program.vertex_list_indexed(
+            4,
+            gl.GL_TRIANGLES,
+            [0, 1, 2, 0, 2, 3],
+            position=("f", (-1, -1, 1, -1, 1, 1, -1, 1)),
+            tex_coords=("f", (0, 0, 1, 0, 1, 1, 0, 1)),
+        )
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """The size of the framebuffer, in world pixels."""
+        return self._size
+
+    def resize(self, width: int, height: int):
+        """Fit the framebuffer to a window of `width` x `height` pixels."""
+        if self._window_size == (width, height):
+            return
+        self._window_size = (width, height)
+        scale = max(min(width / BASE_SIZE[0], height / BASE_SIZE[1]), 1)
+        if self.mode == "integer":
+            scale = int(scale)
+        size = (ceil(width / scale), ceil(height / scale))
+        self._scale = scale
+        if size != self._size:
+            self._size = size
+            self._create_framebuffer()
+        # The framebuffer may be a bit larger than the window, and is kept
+        # in the center, so that the camera does not move.
+        x = (width - size[0] * scale) // 2
+        y = (height - size[1] * scale) // 2
+        x1, y1 = 2 * x / width - 1, 2 * y / height - 1
+        self._vertex_list.position[:] = (x1, y1, -x1, y1, -x1, -y1, x1, -y1)
+
+    def _create_framebuffer(self):
+        self._delete_framebuffer()
+        width, height = self._size
+        tex_filter = gl.GL_NEAREST if self.mode == "integer" else gl.GL_LINEAR
+        self._texture = Texture.create(
+            width, height, min_filter=tex_filter, mag_filter=tex_filter
+        )
+        self._depth_buffer = Renderbuffer(width, height, gl.GL_DEPTH_COMPONENT24)
+        self._framebuffer = Framebuffer()
+        self._framebuffer.attach_texture(self._texture)
+        self._framebuffer.attach_renderbuffer(
+            self._depth_buffer, attachment=gl.GL_DEPTH_ATTACHMENT
+        )
+
+    @contextmanager
+    def render(self, window: "mystery.scene.GameWindow"):
+        """Draw into the framebuffer instead of the window."""
+        self.resize(*window.get_framebuffer_size())
+        width, height = self._size
+        prev_projection = window.projection
+        # Edges of tiles would be blended with what is behind them.
+        polygon_smooth = gl.glIsEnabled(gl.GL_POLYGON_SMOOTH)
+        gl.glDisable(gl.GL_POLYGON_SMOOTH)
+        self._framebuffer.bind()
+        gl.glViewport(0, 0, width, height)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
+        window.projection = Mat4.orthogonal_projection(0, width, 0, height, -255, 255)
+        try:
+            yield
+        finally:
+            window.projection = prev_projection
+            self._framebuffer.unbind()
+            gl.glViewport(0, 0, *window.get_framebuffer_size())
+            if polygon_smooth:
+                gl.glEnable(gl.GL_POLYGON_SMOOTH)
+
+    def blit(self):
+        """Upscale the framebuffer to the window."""
+        self._program.use()
+        self._program["texture_size"] = self._size
+        self._program["scale"] = self._scale
+        gl.glActiveTexture(gl.GL_TEXTURE0)
+        gl.glBindTexture(self._texture.target, self._texture.id)
+        gl.glDisable(gl.GL_BLEND)
+        self._vertex_list.draw(gl.GL_TRIANGLES)
+        gl.glEnable(gl.GL_BLEND)
+        self._program.stop()
+
+    def _delete_framebuffer(self):
+        if self._framebuffer is not None:
+            self._framebuffer.delete()
+            self._depth_buffer.delete()
+            self._texture.delete()
+            self._framebuffer = self._texture = self._depth_buffer = None
+
+    def delete(self):
+        self._delete_framebuffer()
+        self._vertex_list.delete()
+        self._program.delete()
+
+
+__all__ = "BASE_SIZE", "SCALE_MODES", "WorldRenderTarget"
@@ -1,2 +1,8 @@
+from logging import getLogger
+
+# Disable pytmx's logger, which logs when pytmx is imported.
+getLogger("pytmx").setLevel(999)
+
+from mystery.resource.asset import AssetHandle, asset
 from mystery.resource.manager import ResourceManager
-from mystery.resource.region import texture_region
+from mystery.resource.region import region_texture, regions_by_texture, texture_region
@@ -0,0 +1,30 @@
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class AssetHandle(Generic[T]):
+    """A handle of an asset which is loaded when it is used first.
+
+    Modules create handles instead of loading textures and animations when
+    they are imported, so that only the assets which are drawn are loaded.
+    """
+
+    def __init__(self, load: Callable[[], T]):
+        self._load = load
+        self._value = None
+        self._loaded = False
+
+    def get(self) -> T:
+        if not self._loaded:
+            self._value = self._load()
+            self._loaded = True
+        return self._value
+
+
+def asset(load: Callable[[], T]) -> AssetHandle[T]:
+    """Turn a function which loads an asset into an `AssetHandle`."""
+    return AssetHandle(load)
+
+
+__all__ = "AssetHandle", "asset"
@@ -0,0 +1,200 @@
+from json import dump
+from pathlib import Path
+from typing import Callable, Iterable
+from zlib import compress, decompress
+
+# Bump it whenever the layout of the metrics table or pages changes.
+FORMAT_VERSION = 1
+# Glyphs are packed into pages of this width, and at most this height.
+PAGE_SIZE = 1024
+
+
+def font_chars(texts: Iterable[str]) -> str:
+    """Get every character shown by `texts`, sorted."""
+    chars = set()
+    for text in texts:
+        chars.update(text)
+    chars.discard("\n")
+    return "".join(sorted(chars))
+
+
+def table_name(font_name: str) -> str:
+    """Get the resource name of the metrics table of a baked font."""
+    return f"fonts/{font_name.lower()}.json"
+
+
+class _Page:
+    """Coverage of glyphs packed into a page, one byte a pixel from the bottom
+    row up, like the textures they are loaded into."""
+
+    def __init__(self):
+        from pyglet.image.atlas import Allocator
+
+        self.allocator = Allocator(PAGE_SIZE, PAGE_SIZE)
+        self.data = bytearray(PAGE_SIZE * PAGE_SIZE)
+
+    def add(self, width: int, height: int, data: bytes) -> tuple[int, int]:
+        # Glyphs are kept a pixel apart, or they would be blended together.
+        x, y = self.allocator.alloc(width + 2, height + 2)
+        x, y = x + 1, y + 1
+        for row in range(height):
+            start = (y + row) * PAGE_SIZE + x
+            self.data[start : start + width] = data[row * width : (row + 1) * width]
+        return x, y
+
+    def contents(self) -> bytes:
+        height = max(strip.y2 for strip in self.allocator.strips)
+        return compress(bytes(self.data[: height * PAGE_SIZE]), 9)
+
+
+def _glyph_coverage(glyph, images: dict) -> bytes:
+    owner = glyph.owner
+    if owner.id not in images:
+        images[owner.id] = owner.get_image_data()
+    image = images[owner.id].get_region(glyph.x, glyph.y, glyph.width, glyph.height)
+    data = image.get_data("A", glyph.width)
+    # Glyphs rendered by FreeType are upside down in their textures, and the
+    # texture coordinates are flipped instead.
+    if glyph.tex_coords[1] > glyph.tex_coords[7]:
+        rows = [data[i : i + glyph.width] for i in range(0, len(data), glyph.width)]
+        data = b"".join(reversed(rows))
+    return data
+
+
+def bake_font(font_name: str, sizes: Iterable[int], chars: str, directory: Path):
+    """Render `chars` of a font at every size in `sizes`, and save them into
+    `directory` as pages of glyphs and a table of their metrics.
+
+    Glyphs are rendered by pyglet, so it needs an OpenGL context, and the
+    font must be added by `pyglet.font.add_file` first.
+    """
+    from pyglet.font import have_font, load
+    from pyglet.image.atlas import AllocatorException
+
+    if not have_font(font_name):
+        raise ValueError(f"font '{font_name}' is not found")
+    directory.mkdir(parents=True, exist_ok=True)
+    table = {
+        "version": FORMAT_VERSION,
+        "font": font_name,
+        "page_width": PAGE_SIZE,
+        "sizes": {},
+    }
+    for size in sizes:
+        font = load(font_name, size)
+        # Glyphs are all rendered first, since textures of the font are only
+        # read once.
+        font_glyphs = {char: font.get_glyphs(char)[0] for char in chars}
+        pages = [_Page()]
+        images = {}
+        glyphs = {}
+        # Taller glyphs first, so that rows of the pages are filled evenly.
+        for char in sorted(chars, key=lambda c: -font_glyphs[c].height):
+            glyph = font_glyphs[char]
+            page, x, y = 0, 0, 0
+            if glyph.width and glyph.height:
+                data = _glyph_coverage(glyph, images)
+                try:
+                    x, y = pages[-1].add(glyph.width, glyph.height, data)
+                except AllocatorException:
+                    pages.append(_Page())
+                    x, y = pages[-1].add(glyph.width, glyph.height, data)
+                page = len(pages) - 1
+            glyphs[char] = [
+                page,
+                x,
+                y,
+                glyph.width,
+                glyph.height,
+                glyph.baseline,
+                glyph.lsb,
+                glyph.advance,
+                glyph.vertices[0] - glyph.lsb,
+                glyph.vertices[1] + glyph.baseline,
+            ]
+        page_names = []
+        for i, page in enumerate(pages):
+            name = f"{font_name.lower()}_{size}_{i}.bin"
+            (directory / name).write_bytes(page.contents())
+            page_names.append(name)
+        table["sizes"][str(size)] = {"pages": page_names, "glyphs": glyphs}
+    with (directory / Path(table_name(font_name)).name).open("w") as f:
+        dump(table, f, ensure_ascii=False, separators=(",", ":"))
+
+
+class _BakedGlyphs(dict):
+    """Glyphs of a font, which adds the baked ones when it is first looked up,
+    so that pages of unused sizes are never loaded."""
+
+    def __init__(self, glyphs: dict, load: Callable[[], dict]):
+        super().__init__(glyphs)
+        self._load = load
+
+    def _add_baked(self):
+        if self._load is not None:
+            load, self._load = self._load, None
+            for char, glyph in load().items():
+                self.setdefault(char, glyph)
+
+    def __contains__(self, char) -> bool:
+        self._add_baked()
+        return super().__contains__(char)
+
+    def __missing__(self, char):
+        if self._load is None:
+            raise KeyError(char)
+        self._add_baked()
+        return self[char]
+
+
+def _load_glyphs(baked: dict, width: int, read: Callable[[str], bytes]) -> dict:
+    from pyglet.font.base import Glyph
+    from pyglet.image import ImageData, Texture
+
+    pages = []
+    for name in baked["pages"]:
+        coverage = decompress(read(f"fonts/{name}"))
+        # Alpha textures are not in OpenGL core profiles, so white pixels are
+        # uploaded with the coverage as their alpha.
+        data = bytearray(b"\xff") * (len(coverage) * 4)
+        data[3::4] = coverage
+        image = ImageData(width, len(coverage) // width, "RGBA", bytes(data))
+        texture = Texture.create(image.width, image.height)
+        texture.blit_into(image, 0, 0, 0)
+        pages.append(texture)
+    glyphs = {}
+    for char, metrics in baked["glyphs"].items():
+        page, x, y, glyph_width, glyph_height, *bearings = metrics
+        glyph = Glyph(x, y, 0, glyph_width, glyph_height, pages[page])
+        glyph.set_bearings(*bearings)
+        glyphs[char] = glyph
+    return glyphs
+
+
+def baked_chars(table: dict, size: int) -> set[str]:
+    """Get the characters baked at `size`."""
+    return set(table["sizes"].get(str(size), {}).get("glyphs", ()))
+
+
+def add_baked_glyphs(font, table: dict, read: Callable[[str], bytes]):
+    """Put the glyphs baked by `bake_font` into `font`, a font loaded by
+    `pyglet.font.load`, which renders only the other glyphs itself.
+
+    Pages are only loaded when a glyph of `font` is first looked up. `read`
+    gets the contents of a page by its resource name.
+    """
+    baked = table["sizes"].get(str(font.size))
+    if baked is None:
+        return
+    width = table["page_width"]
+    font.glyphs = _BakedGlyphs(font.glyphs, lambda: _load_glyphs(baked, width, read))
+
+
+__all__ = (
+    "FORMAT_VERSION",
+    "font_chars",
+    "table_name",
+    "bake_font",
+    "baked_chars",
+    "add_baked_glyphs",
+)
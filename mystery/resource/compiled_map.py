@@ -0,0 +1,275 @@
+import sys
+from array import array
+from hashlib import blake2b
+from json import dumps, loads
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from posixpath import dirname, join, normpath
+from re import compile as re_compile
+from struct import Struct
+from typing import Callable, Optional
+from xml.etree import ElementTree
+
+from pytmx import TiledMap, TiledTileLayer
+
+# Bump it whenever the layout of compiled maps changes.
+FORMAT_VERSION = 1
+MAGIC = b"MYSTMAP"
+# Every layer is cut into chunks of `CHUNK_SIZE` x `CHUNK_SIZE` tiles.
+CHUNK_SIZE = 16
+
+# magic, format version, length of the header
+_prelude = Struct("<7sBI")
+_gid_size = array("I").itemsize
+_tileset_source = re_compile(rb'<tileset[^>]*\ssource="([^"]+)"')
+
+
+def map_sources(filename: str, read: Callable[[str], bytes]) -> dict[str, bytes]:
+    """Read a *.tmx file and all *.tsx files used by it.
+
+    `read` gets the contents of a file by its resource name, so the files can
+    be anywhere `pyglet.resource.Loader` can find them.
+    """
+    contents = read(filename)
+    sources = {filename: contents}
+    for source in _tileset_source.findall(contents):
+        name = normpath(join(dirname(filename), source.decode()))
+        if name not in sources:
+            sources[name] = read(name)
+    return sources
+
+
+def map_digest(sources: dict[str, bytes]) -> str:
+    """Get a hash of the files returned by `map_sources`."""
+    digest = blake2b(digest_size=16)
+    digest.update(f"{FORMAT_VERSION}{sys.byteorder}".encode())
+    for name, contents in sources.items():
+        digest.update(name.encode())
+        digest.update(contents)
+    return digest.hexdigest()
+
+
+def parse_map(filename: str, sources: dict[str, bytes], image_loader) -> TiledMap:
+    """Parse a map from the files returned by `map_sources`.
+
+    External tilesets are put into the map before it is parsed, since pytmx
+    can only read them from the disk. Paths of images are made relative to
+    the map, so `image_loader` gets resource names such as
+    "maps/tilesets/terrain.png".
+    """
+    root = ElementTree.fromstring(sources[filename])
+    for node in root.findall("tileset"):
+        source = node.attrib.pop("source", None)
+        if source is None:
+            continue
+        tileset = ElementTree.fromstring(
+            sources[normpath(join(dirname(filename), source))]
+        )
+        for image in tileset.iter("image"):
+            image.set("source", join(dirname(source), image.get("source")))
+        node.attrib.update(tileset.attrib)
+        node.extend(tileset)
+    tiled_map = TiledMap(image_loader=image_loader, invert_y=True)
+    tiled_map.filename = filename
+    tiled_map.parse_xml(root)
+    return tiled_map
+
+
+def compile_map(tiled_map: TiledMap) -> bytes:
+    """Turn a map into the binary format read by `CompiledMap`.
+
+    `tiled_map` must be loaded by an image loader which returns the name of
+    the image and the area of the tile, see `ResourceManager._compile_map`.
+    """
+    tilesets = []
+    images = []
+    for gid, tile in enumerate(tiled_map.images):
+        if not tile:
+            continue
+        filename, rect = tile
+        filename = normpath(filename.replace("\\", "/"))
+        if filename not in tilesets:
+            tilesets.append(filename)
+        images.append((gid, tilesets.index(filename), *(rect or ())))
+    layers = []
+    data = array("I")
+    for layer in tiled_map.layers:
+        if not isinstance(layer, TiledTileLayer):
+            continue
+        layers.append((layer.name, layer.width, layer.height, len(data)))
+        for row in layer.data:
+            data.extend(row)
+    objects = [
+        (
+            obj.type,
+            obj.name,
+            obj.x,
+            obj.y,
+            obj.width,
+            obj.height,
+            obj.gid,
+            obj.properties,
+        )
+        for obj in tiled_map.objects
+    ]
+    header = dumps(
+        {
+            "size": (tiled_map.width, tiled_map.height),
+            "tile_size": (tiled_map.tilewidth, tiled_map.tileheight),
+            "tilesets": tilesets,
+            "images": images,
+            "layers": layers,
+            "objects": objects,
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    # Keep the gids aligned, so that they can be read without copying.
+    header += b" " * (-(_prelude.size + len(header)) % data.itemsize)
+    return _prelude.pack(MAGIC, FORMAT_VERSION, len(header)) + header + data.tobytes()
+
+
+class CompiledTileLayer:
+    """A tile layer of `CompiledMap`, which works like `TiledTileLayer`."""
+
+    def __init__(self, parent: "CompiledMap", name: str, width: int, height: int, data):
+        self.parent = parent
+        self.name = name
+        self.width = width
+        self.height = height
+        # A flat view of the gids in the compiled map.
+        self.data = data
+        self._chunks = None
+
+    def chunks(self) -> dict[tuple[int, int], tuple[tuple[int, ...], list]]:
+        """Get the vertices of every chunk, which are built when first used.
+
+        A chunk is `(area, [(gid, positions, tex_coords, indices), ...])`,
+        with the vertices of each tileset and a gid of one of its tiles.
+        Only the sizes and texture coordinates of images are read, so worker
+        threads can build them before any texture is created.
+        """
+        if self._chunks is None:
+            self._chunks = self._build_chunks()
+        return self._chunks
+
+    def _build_chunks(self) -> dict[tuple[int, int], tuple[tuple[int, ...], list]]:
+        parent = self.parent
+        tw, th = parent.tilewidth, parent.tileheight
+        width, h = self.width, self.height - 1
+        # {(column, row): {tileset: [gid, positions, tex_coords]}}
+        data: dict[tuple[int, int], dict[int, list]] = {}
+        for i, gid in enumerate(self.data):
+            if not gid:
+                continue
+            x, y = i % width, i // width
+            image = parent.images[gid]
+            chunk = (x // CHUNK_SIZE, (h - y) // CHUNK_SIZE)
+            tileset_data = data.setdefault(chunk, {})
+            tileset = parent.image_tilesets[gid]
+            if tileset not in tileset_data:
+                tileset_data[tileset] = [gid, [], []]
+            _, positions, tex_coords = tileset_data[tileset]
+            x1, y1 = x * tw, (h - y) * th
+            x2, y2 = x1 + image.width, y1 + image.height
+            positions.extend((x1, y1, x2, y1, x2, y2, x1, y2))
+            tex_coords.extend(image.tex_coords)
+
+        chunks = {}
+        for chunk, tileset_data in data.items():
+            xs, ys = [], []
+            for _, positions, _ in tileset_data.values():
+                xs.extend(positions[0::2])
+                ys.extend(positions[1::2])
+            x, y = min(xs), min(ys)
+            # The bounding box of all tiles, which may be larger than the
+            # chunk itself if some tiles are higher or wider than the grid.
+            area = (x, y, max(xs) - x, max(ys) - y)
+            vertices = []
+            for gid, positions, tex_coords in tileset_data.values():
+                indices = []
+                for i in range(0, len(positions) // 2, 4):
+                    indices.extend((i, i + 1, i + 2, i, i + 2, i + 3))
+                vertices.append((gid, positions, tex_coords, indices))
+            chunks[chunk] = (area, vertices)
+        return chunks
+
+
+class CompiledObject:
+    """An object of `CompiledMap`, which works like `TiledObject`."""
+
+    __slots__ = "type", "name", "x", "y", "width", "height", "gid", "properties"
+
+    def __init__(self, type, name, x, y, width, height, gid, properties):
+        self.type = type
+        self.name = name
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.gid = gid
+        self.properties = properties
+
+
+class CompiledMap:
+    """A map read from the output of `compile_map`.
+
+    The gids of tile layers are read straight from the buffer, which may be a
+    memory-mapped file, so no XML is parsed and nothing is decompressed.
+    Only the tile layers and the objects needed by rooms are kept.
+    """
+
+    def __init__(self, buffer, image_loader):
+        view = memoryview(buffer)
+        if len(view) < _prelude.size:
+            raise ValueError("not a compiled map of this version")
+        magic, version, length = _prelude.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("not a compiled map of this version")
+        start = _prelude.size + length
+        # A truncated file is compiled again, rather than missing some tiles.
+        if len(view) < start or (len(view) - start) % _gid_size:
+            raise ValueError("compiled map is truncated")
+        header = loads(bytes(view[_prelude.size : start]).decode("utf-8"))
+        data = view[start:].cast("I")
+        if len(data) != sum(width * height for _, width, height, _ in header["layers"]):
+            raise ValueError("compiled map is truncated")
+
+        self.width, self.height = header["size"]
+        self.tilewidth, self.tileheight = header["tile_size"]
+        self.layers = [
+            CompiledTileLayer(self, name, width, height, data[i : i + width * height])
+            for name, width, height, i in header["layers"]
+        ]
+        self.objects = [CompiledObject(*obj) for obj in header["objects"]]
+        gids = max((i[0] for i in header["images"]), default=0) + 1
+        self.images = [None] * gids
+        # The tileset of every image, so that tiles can be grouped by their
+        # textures before the textures exist.
+        self.image_tilesets = [None] * gids
+        loaders = [image_loader(tileset, None) for tileset in header["tilesets"]]
+        for gid, tileset, *rect in header["images"]:
+            self.images[gid] = loaders[tileset](tuple(rect) or None, None)
+            self.image_tilesets[gid] = tileset
+
+    @classmethod
+    def open(cls, filename: Path, image_loader) -> "CompiledMap":
+        with open(filename, "rb") as f:
+            # The mapping stays open as long as the map is alive.
+            buffer = mmap(f.fileno(), 0, access=ACCESS_READ)
+        return cls(buffer, image_loader)
+
+    def get_tile_image_by_gid(self, gid: int) -> Optional[object]:
+        return self.images[gid]
+
+
+__all__ = (
+    "CHUNK_SIZE",
+    "map_sources",
+    "map_digest",
+    "parse_map",
+    "compile_map",
+    "CompiledTileLayer",
+    "CompiledObject",
+    "CompiledMap",
+)
@@ -1,16 +1,38 @@
 import sys
 from atexit import register as atexit_register
+from concurrent.futures import Future, ThreadPoolExecutor
 from json import load, loads
-from os import makedirs
+from os import replace
 from pathlib import Path
-from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Iterator, Optional
 
 from pyglet import gl
 from pyglet.font import have_font
 from pyglet.font import load as load_font
+from pyglet.image import AbstractImage, Texture, TextureRegion
 from pyglet.image import load as load_image
-from pyglet.resource import Loader
-from pytmx import TiledMap, TileFlags
+from pyglet.image.atlas import TextureBin
+from pyglet.resource import Loader, ResourceNotFoundException
+from pytmx import TileFlags
+
+from mystery.profiler import startup_profiler
+from mystery.resource.baked_font import (
+    FORMAT_VERSION,
+    add_baked_glyphs,
+    baked_chars,
+    font_chars,
+    table_name,
+)
+from mystery.resource.compiled_map import (
+    CompiledMap,
+    compile_map,
+    map_digest,
+    map_sources,
+    parse_map,
+)
+from mystery.resource.region import region_texture, regions_by_texture
+from mystery.trace import traced
 
 FONT_NAME = "Unifont"
 SUPPORTED_LANG = {
@@ -20,12 +42,40 @@ SUPPORTED_LANG = {
     "zh_hk": "繁體中文 (中國香港)",
     "zh_tw": "繁體中文 (中國臺灣)",
 }
+# Font sizes used by the GUI, whose glyphs are rendered ahead of time.
+GLYPH_SIZES = (12, 16, 18, 24)
+
+
+class _DecodedTile:
+    """A tile of a tileset which is decoded but not uploaded yet.
+
+    It has the size and texture coordinates of the region it becomes, so
+    that the vertices of tile layers can be built by worker threads.
+    """
+
+    __slots__ = "filename", "image", "rect", "width", "height", "tex_coords"
+
+    def __init__(self, filename: str, image: AbstractImage, rect):
+        self.filename = filename
+        self.image = image
+        self.rect = rect
+        if not rect:
+            self.width, self.height = image.width, image.height
+            self.tex_coords = Texture.tex_coords
+            return
+        x, y, self.width, self.height = rect
+        # Like `TextureRegion`, with the y axis flipped as in `_finish_map`.
+        y = image.height - y - self.height
+        u1, v1 = x / image.width, y / image.height
+        u2 = (x + self.width) / image.width
+        v2 = (y + self.height) / image.height
+        self.tex_coords = (u1, v1, 0, u2, v1, 0, u2, v2, 0, u1, v2, 0)
 
 
 class ResourceManager:
     """Manage resources."""
 
-    def __init__(self):
+    def __init__(self, cache_path: Optional[Path] = None):
         if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
             path = "assets"
             self._frozen = True
@@ -36,17 +86,29 @@ class ResourceManager:
         self._lang = "en_us"
         self._translation_en_us = load(self.loader.file("i18n/en_us.json", mode="r"))
         self._translation_now = {}
-
-        # Create temporary directory for *.tmx files.
-        if not self._frozen:
-            self._tmpdir = TemporaryDirectory(prefix="mystery-")
-            atexit_register(self._tmpdir.cleanup)
-            self.copy_to_tempdir()
+        # GUI, key, book and character textures are packed into atlases of
+        # their own, see `ResourceManager.atlas_image`.
+        self._atlas = None
+        self._atlas_images: dict[str, TextureRegion] = {}
+        self._regions: dict[str, TextureRegion] = {}
+        # Maps are parsed by worker threads ahead of time, see
+        # `ResourceManager.prefetch_map`.
+        self._executor = None
+        self._prefetched: dict[str, Future] = {}
+        self._tilesets: dict[str, Texture] = {}
+        # Compiled maps are saved here, see `ResourceManager._load_map`.
+        self._cache_path = cache_path
+        # Glyphs being rendered, see `ResourceManager.prewarm_glyphs`.
+        self._glyph_steps: Optional[Iterator[None]] = None
 
         # Load uninstalled font.
-        if not have_font("Unifont"):
-            self.loader.add_font("unifont.otf")
-        self.font = load_font("Unifont")
+        with startup_profiler.phase("load_font"):
+            if not have_font("Unifont"):
+                self.loader.add_font("unifont.otf")
+            self.font = load_font("Unifont")
+        with startup_profiler.phase("load_baked_font"):
+            self._baked_table = self._load_baked_table()
+            self._baked_fonts = self._add_baked_glyphs()
 
     @property
     def language(self) -> str:
@@ -57,6 +119,7 @@ class ResourceManager:
         if name not in SUPPORTED_LANG:
             name = "en_us"
         self._lang = name
+        self._glyph_steps = self._render_glyphs()
         if self._lang == "en_us":
             self._translation_now = self._translation_en_us
             return
@@ -64,8 +127,105 @@ class ResourceManager:
         s = contents.decode("utf-8")
         self._translation_now = loads(s)
 
+    def _load_baked_table(self) -> Optional[dict]:
+        # Glyphs baked by build.py, see `mystery.resource.baked_font`.
+        try:
+            table = load(self.loader.file(table_name(FONT_NAME), mode="r"))
+        except ResourceNotFoundException:
+            return None
+        if table.get("version") != FORMAT_VERSION or table.get("font") != FONT_NAME:
+            return None
+        return table
+
+    def _add_baked_glyphs(self) -> list:
+        # Pages of each size are loaded when the size is first used. Fonts
+        # are kept here, or pyglet would forget them along with the glyphs.
+        if self._baked_table is None:
+            return []
+        fonts = []
+        for size in GLYPH_SIZES:
+            font = load_font(FONT_NAME, size)
+            add_baked_glyphs(font, self._baked_table, self._read)
+            fonts.append(font)
+        return fonts
+
+    def _render_glyphs(self) -> Iterator[None]:
+        # Started when the language is changed, but only run after the new
+        # translation is loaded. Baked glyphs are skipped, so that their pages
+        # are not loaded before they are drawn.
+        text = font_chars(
+            [
+                *SUPPORTED_LANG.values(),
+                *self._translation_en_us.values(),
+                *self._translation_now.values(),
+            ]
+        )
+        for size in GLYPH_SIZES:
+            chars = text
+            if self._baked_table is not None:
+                baked = baked_chars(self._baked_table, size)
+                chars = "".join(c for c in text if c not in baked)
+            font = load_font(FONT_NAME, size)
+            for i in range(0, len(chars), 4):
+                font.get_glyphs(chars[i : i + 4])
+                yield
+
+    @traced
+    def prewarm_glyphs(self, budget: float = 0.002) -> bool:
+        """Render glyphs of the current language into the glyph atlas for at
+        most `budget` seconds, and return whether all of them are rendered.
+
+        Glyphs are rendered by pyglet when they are first drawn, which may
+        take a while for a line of CJK text. This should be called every
+        frame after the language is changed.
+        """
+        if self._glyph_steps is None:
+            return True
+        end = perf_counter() + budget
+        for _ in self._glyph_steps:
+            if perf_counter() >= end:
+                return False
+        self._glyph_steps = None
+        return True
+
+    def _add_to_atlas(self, image: AbstractImage) -> TextureRegion:
+        if self._atlas is None:
+            self._atlas = TextureBin()
+        return self._atlas.add(image, border=1)
+
+    def atlas_image(self, name: str) -> TextureRegion:
+        """Load a whole image into the texture atlases of the game."""
+        if name not in self._atlas_images:
+            image = self._load_image(name)
+            self._atlas_images[name] = self._add_to_atlas(image)
+        return self._atlas_images[name]
+
+    def region(self, name: str) -> TextureRegion:
+        """Get a region in `texture_region` from the texture atlases.
+
+        Only the regions are packed, not the whole textures they are cut from.
+        """
+        if name not in self._regions:
+            texture_name = region_texture[name]
+            image = self._load_image(texture_name)
+            for region_name, area in regions_by_texture[texture_name].items():
+                region = image.get_region(*area)
+                self._regions[region_name] = self._add_to_atlas(region)
+        return self._regions[name]
+
+    def _tileset_texture(
+        self, filename: str, image: Optional[AbstractImage] = None
+    ) -> Texture:
+        # Tiles share the texture of their tileset, so that a tile layer can
+        # be drawn with only one texture bound.
+        if filename not in self._tilesets:
+            if image is None:
+                image = self._load_image(filename)
+            self._tilesets[filename] = image.get_texture()
+        return self._tilesets[filename]
+
     def _image_loader(self, filename: str, flags, **kwargs):
-        image = load_image(filename)
+        image = self._tileset_texture(filename)
 
         def custom_load_image(rect: tuple[int, ...] = None, flags: TileFlags = None):
             if rect:
@@ -78,34 +238,103 @@ class ResourceManager:
 
         return custom_load_image
 
-    def copy_to_tempdir(self):
-        files = [
-            Path("start.tmx"),
-            Path("start_tent.tmx"),
-            Path("tilesets/mask.png"),
-            Path("tilesets/mask.tsx"),
-            Path("tilesets/outside_objects.png"),
-            Path("tilesets/outside_objects.tsx"),
-            Path("tilesets/terrain.png"),
-            Path("tilesets/terrain.tsx"),
-        ]
-        makedirs(Path(self._tmpdir.name) / "tilesets", exist_ok=True)
-        for f in files:
-            contents = self.loader.file(str(Path("maps") / f).replace("\\", "/")).read()
-            name = Path(self._tmpdir.name) / f
-            with open(name, "wb") as target:
-                target.write(contents)
-
-    def tiled_map(self, name: str) -> TiledMap:
-        if self._frozen:
-            filename = Path(sys._MEIPASS) / "assets" / "maps" / f"{name}.tmx"
-        else:
-            filename = Path(self._tmpdir.name) / f"{name}.tmx"
-        kwargs = {
-            "image_loader": self._image_loader,
-            "invert_y": True,
-        }
-        return TiledMap(filename, **kwargs)
+    def _deferred_image_loader(self, filename: str, flags, **kwargs):
+        # Used by worker threads, which must not touch OpenGL. Images are
+        # only decoded here, and turned into textures by `_finish_map`.
+        image = self._tilesets.get(filename) or self._load_image(filename)
+
+        def custom_load_image(rect: tuple[int, ...] = None, flags: TileFlags = None):
+            return _DecodedTile(filename, image, rect)
+
+        return custom_load_image
+
+    def _prefetch(self, name: str) -> CompiledMap:
+        tiled_map = self._load_map(name, self._deferred_image_loader)
+        for layer in tiled_map.layers:
+            layer.chunks()
+        return tiled_map
+
+    def _finish_map(self, tiled_map: CompiledMap):
+        for gid, tile in enumerate(tiled_map.images):
+            if not isinstance(tile, _DecodedTile):
+                continue
+            texture = self._tileset_texture(tile.filename, tile.image)
+            if tile.rect:
+                x, y, w, h = tile.rect
+                y = texture.height - y - h
+                tiled_map.images[gid] = texture.get_region(x, y, w, h)
+            else:
+                tiled_map.images[gid] = texture
+
+    def _load_image(self, name: str) -> AbstractImage:
+        with self.loader.file(name) as f:
+            return load_image(name, file=f)
+
+    def _read(self, name: str) -> bytes:
+        with self.loader.file(name) as f:
+            return f.read()
+
+    def _compile_map(self, filename: str, sources: dict[str, bytes]) -> bytes:
+        def image_loader(filename: str, flags, **kwargs):
+            # Only record where the tiles are, images are loaded later.
+            def custom_load_image(rect: tuple[int, ...] = None, flags=None):
+                return filename, rect
+
+            return custom_load_image
+
+        return compile_map(parse_map(filename, sources, image_loader))
+
+    def _load_map(self, name: str, image_loader) -> CompiledMap:
+        """Load a map from the cache, or compile it if it is not cached.
+
+        Maps and tilesets are read through `loader`, so nothing is copied to
+        the disk. Compiled maps are named after the hash of their *.tmx and
+        *.tsx files, so a changed map is compiled again.
+        """
+        filename = f"maps/{name}.tmx"
+        sources = map_sources(filename, self._read)
+        if self._cache_path is None:
+            return CompiledMap(self._compile_map(filename, sources), image_loader)
+        digest = map_digest(sources)
+        cache_file = self._cache_path / f"{name}-{digest}.map"
+        if cache_file.exists():
+            try:
+                return CompiledMap.open(cache_file, image_loader)
+            except ValueError:
+                pass
+        contents = self._compile_map(filename, sources)
+        for old in self._cache_path.glob(f"{name}-*.map"):
+            old.unlink(missing_ok=True)
+        # Write to a temporary file first, since other threads may be loading
+        # the same map.
+        temp = cache_file.with_suffix(f".{id(contents)}.tmp")
+        temp.write_bytes(contents)
+        replace(temp, cache_file)
+        return CompiledMap(contents, image_loader)
+
+    def prefetch_map(self, name: str):
+        """Parse a map and build the vertices of its tile layers in the
+        background, so that `tiled_map` and `TileLayer` are quick."""
+        if name in self._prefetched:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="mystery-prefetch"
+            )
+            atexit_register(self._executor.shutdown, wait=False, cancel_futures=True)
+        self._prefetched[name] = self._executor.submit(self._prefetch, name)
+
+    def tiled_map(self, name: str) -> CompiledMap:
+        if (future := self._prefetched.pop(name, None)) is not None:
+            try:
+                tiled_map = future.result()
+            except Exception:
+                # Parse it again, so that the error is raised here.
+                pass
+            else:
+                self._finish_map(tiled_map)
+                return tiled_map
+        return self._load_map(name, self._image_loader)
 
     def translate(self, name: str, **kwargs) -> str:
         """Get the translation of `name`.
@@ -125,4 +354,4 @@ class ResourceManager:
             return name
 
 
-__all__ = "FONT_NAME", "SUPPORTED_LANG", "ResourceManager"
+__all__ = "FONT_NAME", "SUPPORTED_LANG", "GLYPH_SIZES", "ResourceManager"
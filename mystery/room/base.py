@@ -3,13 +3,13 @@ from typing import Optional
 from pyglet.event import EventDispatcher
 from pyglet.graphics import Batch, Group
 from pyglet.math import Mat4, Vec3
-from pyglet.sprite import Sprite
-from pytmx import TiledTileLayer
 
 from mystery.character import Character, CharacterDirection
 from mystery.depth_sprite import DepthSprite
 from mystery.scene.game import GameScene
-from mystery.utils import Rect
+from mystery.tilemap import CHUNK_SIZE, TileLayer
+from mystery.trace import traced
+from mystery.utils import Rect, WalkMap
 
 
 class BaseRoom(EventDispatcher):
@@ -36,7 +36,7 @@ class BaseRoom(EventDispatcher):
         }
         self.gui_batch = Batch()
         self.sprite_groups = []
-        self.sprites_list = []
+        self.tile_layers = []
         self.stiles_dict = {}
 
         self.character = character
@@ -44,7 +44,9 @@ class BaseRoom(EventDispatcher):
         self.character.room = self
 
         self._collision_rectangles = {}
+        self._walk_map = WalkMap([])
         self._spawn_points = {}
+        self._view_chunks = None
 
         # A dict that store the room info.
         # It must be capable of turning into JSON!
@@ -59,22 +61,13 @@ class BaseRoom(EventDispatcher):
             return
         tw, th = self.tiled_map.tilewidth, self.tiled_map.tileheight
         for layer in self.tiled_map.layers:
-            if not isinstance(layer, TiledTileLayer):
-                continue
             batch_name, group_order = layer.name.split("_")
             group = Group(int(group_order))
             self.sprite_groups.append(group)
-            h = layer.height - 1
-            for tile in layer.tiles():
-                x, y, image = tile
-                sprite = Sprite(
-                    image,
-                    x * tw,
-                    (h - y) * th,
-                    batch=self.map_batches[batch_name],
-                    group=group,
-                )
-                self.sprites_list.append(sprite)
+            tile_layer = TileLayer(
+                layer, tw, th, batch=self.map_batches[batch_name], group=group
+            )
+            self.tile_layers.append(tile_layer)
         for obj in self.tiled_map.objects:
             obj.y = (
                 (self.tiled_map.tileheight * self.tiled_map.height) - obj.y - obj.height
@@ -94,8 +87,10 @@ class BaseRoom(EventDispatcher):
             elif obj.type == "SPoint":
                 # SPoint refers to "Spawn Point"
                 self._spawn_points[obj.name] = (obj.x - 32, obj.y + 4)
+        self._walk_map = WalkMap(self._collision_rectangles.values())
         self._map_loaded = True
 
+    @traced
     def _update_stiles(self):
         char_y = self.character.position[1] + 4
         for stile in self.stiles_dict.values():
@@ -104,22 +99,62 @@ class BaseRoom(EventDispatcher):
             else:
                 stile.z = 2
 
-    def allow_move(self, pos: tuple[int, int]) -> bool:
+    def _cull(self, width: int, height: int):
+        """Hide chunks and special tiles which are out of a camera of `width`
+        x `height` pixels.
+
+        The visible area is aligned to chunks, so it only needs to be updated
+        when the camera crosses the edge of a chunk.
+        """
+        char_x, char_y = self.character.render_position
+        x = char_x - width // 2 + 32
+        y = char_y - height // 2 + 32
+        size_x = CHUNK_SIZE * self.tiled_map.tilewidth
+        size_y = CHUNK_SIZE * self.tiled_map.tileheight
+        c1, r1 = int(x // size_x), int(y // size_y)
+        c2, r2 = int((x + width) // size_x), int((y + height) // size_y)
+        if self._view_chunks == (c1, r1, c2, r2):
+            return
+        self._view_chunks = (c1, r1, c2, r2)
+        area = (
+            c1 * size_x,
+            r1 * size_y,
+            (c2 - c1 + 1) * size_x,
+            (r2 - r1 + 1) * size_y,
+        )
+        for tile_layer in self.tile_layers:
+            tile_layer.cull(area)
+        vx, vy, vw, vh = area
+        for stile in self.stiles_dict.values():
+            stile.visible = (
+                stile.x < vx + vw
+                and vx < stile.x + stile.width
+                and stile.y < vy + vh
+                and vy < stile.y + stile.height
+            )
+
+    @traced
+    def sweep(
+        self, pos: tuple[int, int], displacement: tuple[int, int]
+    ) -> tuple[int, int]:
+        """Get the furthest position that a character at `pos` can reach by
+        moving `displacement`.
+
+        Only horizontal and vertical moves are supported.
+        """
         x, y = pos
-        pos1 = (x + 20, y + 4)
-        pos2 = (x + 44, y + 4)
-        check1, check2 = [], []
-        for rect in self._collision_rectangles.values():
-            if (pos1 in rect or pos2 in rect) and not rect.walkable:
-                return False
-            else:
-                check1.append(pos1 in rect)
-                check2.append(pos2 in rect)
-        if any(check1) and any(check2):
-            self._update_stiles()
-            return True
-        else:
-            return False
+        dx, dy = displacement
+        distance = abs(dx) + abs(dy)
+        if distance == 0:
+            return pos
+        direction = (dx // distance, dy // distance)
+        for foot_x in (x + 20, x + 44):
+            foot = (foot_x + direction[0], y + 4 + direction[1])
+            distance = min(distance, self._walk_map.run(foot, direction))
+        if distance == 0:
+            return pos
+        self._update_stiles()
+        return x + direction[0] * distance, y + direction[1] * distance
 
     def check_collide(self, which: str) -> bool:
         """Check whether a character can intercat with a collision box.
@@ -145,21 +180,41 @@ class BaseRoom(EventDispatcher):
         else:
             return False
 
-    def draw(self):
-        char_pos = Vec3(*self.character.position, 0)
-        center_pos = Vec3(
-            self.game.window.width // 2 - 32, self.game.window.height // 2 - 32, 0
-        )
+    def _draw_map(self, width: int, height: int):
+        char_pos = Vec3(*self.character.render_position, 0)
+        center_pos = Vec3(width // 2 - 32, height // 2 - 32, 0)
         trans_mat = Mat4.from_translation(center_pos - char_pos)
+        self._cull(width, height)
+        performance = self.game.window.performance
         with self.game.window.apply_view(trans_mat):
-            self.map_batches["back"].draw()
-            self.map_batches["char"].draw()
-            self.map_batches["fore"].draw()
-        self.gui_batch.draw()
+            performance.draw("map.back", self.map_batches["back"])
+            performance.draw("map.char", self.map_batches["char"])
+            performance.draw("map.fore", self.map_batches["fore"])
+
+    def draw(self):
+        window = self.game.window
+        if window.world_target is None:
+            self._draw_map(window.width, window.height)
+        else:
+            # The map is drawn at a low resolution, but the GUI is not.
+            with window.world_target.render(window):
+                self._draw_map(*window.world_target.size)
+            window.world_target.blit()
+        window.performance.draw("room.gui", self.gui_batch)
 
     def interact(self):
         pass
 
+    def delete(self):
+        """Free the vertex lists of the map, when the room is not used any
+        more."""
+        for tile_layer in self.tile_layers:
+            tile_layer.delete()
+        self.tile_layers.clear()
+        for sprite in self.stiles_dict.values():
+            sprite.delete()
+        self.stiles_dict.clear()
+
     def on_room_enter(self, *args):
         pass
 
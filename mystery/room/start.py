@@ -45,6 +45,10 @@ class StartRoom(BaseRoom):
                 i += 1
 
     def _next_plot(self):
+        if self.message_box.revealing:
+            # The first press shows the whole text.
+            self.message_box.skip()
+            return
         if self._now_plot + 1 >= len(self.plots):
             self._switch_state()
         if self._now_plot + 1 < len(self.plots):
@@ -3,14 +3,43 @@ from __future__ import annotations
 from contextlib import contextmanager
 from time import strftime
 
+from pyglet import clock
 from pyglet.event import EventDispatcher
-from pyglet.image import get_buffer_manager
 from pyglet.math import Mat4
 from pyglet.window import Window, key
 
 from mystery import data_path, game_setting, resmgr
 from mystery import version as mystery_ver
 from mystery.gui.frame import WidgetFrame
+from mystery.gui.hud import PerformanceHUD
+from mystery.performance import PerformanceMonitor
+from mystery.render_target import WorldRenderTarget
+from mystery.screenshot import BURST_FRAMES, ScreenshotCapture
+from mystery.trace import TRACE_FRAMES, traced, tracer
+from mystery.watchdog import HitchDetector
+
+# How many frames are drawn a second when the window is not focused.
+BACKGROUND_FPS = 5
+# Events which may change what is on the window, so that it is drawn again.
+REDRAW_EVENTS = frozenset(
+    {
+        "on_key_press",
+        "on_key_release",
+        "on_text",
+        "on_text_motion",
+        "on_text_motion_select",
+        "on_mouse_motion",
+        "on_mouse_press",
+        "on_mouse_release",
+        "on_mouse_drag",
+        "on_mouse_scroll",
+        "on_mouse_enter",
+        "on_mouse_leave",
+        "on_resize",
+        "on_expose",
+        "on_show",
+    }
+)
 
 
 class Scene(EventDispatcher):
@@ -21,6 +50,20 @@ class Scene(EventDispatcher):
         self.frame = WidgetFrame(self.window)
         self.language = self.window.resource.language
 
+    @property
+    def animating(self) -> bool:
+        """Whether the scene changes by itself, so that it is drawn every
+        frame."""
+        return False
+
+    def invalidate(self):
+        """Draw the scene again in the next frame."""
+        self.window.invalidate()
+
+    def delete(self):
+        """Free the resources of the scene, which is not used any more."""
+        pass
+
     def on_language_change(self):
         """The callback function on changing the language."""
         pass
@@ -33,11 +76,21 @@ class Scene(EventDispatcher):
         """The callback function when leaving the scene."""
         pass
 
+    def on_scene_pause(self):
+        """The callback function when the window is hidden or unfocused."""
+        pass
+
+    def on_scene_resume(self):
+        """The callback function when the window is shown and focused again."""
+        pass
+
 
 Scene.register_event_type("on_resize")
 Scene.register_event_type("on_language_change")
 Scene.register_event_type("on_scene_enter")
 Scene.register_event_type("on_scene_leave")
+Scene.register_event_type("on_scene_pause")
+Scene.register_event_type("on_scene_resume")
 
 
 class GameWindow(Window):
@@ -50,8 +103,25 @@ class GameWindow(Window):
         self.set_minimum_size(768, 576)
         self._scenes: dict[str, Scene] = {}
         self._now = ""
+        self._dirty = True
+        self._active = True
+        self._visible = True
+        self._paused = False
         self.resource = resmgr
         self.setting = game_setting
+        self.performance = PerformanceMonitor()
+        self._performance_hud = None
+        # The world is drawn at a low resolution then upscaled, unless the
+        # scale mode is "native".
+        self.world_target = None
+        if game_setting["world_scale"] != "native":
+            self.world_target = WorldRenderTarget(game_setting["world_scale"])
+        self.screenshots = ScreenshotCapture(data_path / "screenshots")
+        self.hitch_detector = HitchDetector(
+            data_path / "log" / "hitch.log",
+            self._hitch_context,
+            budget=1 / game_setting["fps"],
+        )
 
     @property
     def scene(self) -> str:
@@ -61,6 +131,38 @@ class GameWindow(Window):
     def scene(self, name: str):
         self.switch_scene(name)
 
+    @property
+    def current_scene(self) -> Scene | None:
+        """The scene being shown, if there is one."""
+        return self._scenes.get(self._now)
+
+    @property
+    def needs_redraw(self) -> bool:
+        """Whether the next frame should be drawn.
+
+        Unless the "continuous_rendering" setting is on, the window is only
+        drawn when it is invalidated or something is being animated.
+        """
+        scene = self.current_scene
+        return (
+            self._dirty
+            or self.setting["continuous_rendering"]
+            or scene is None
+            or scene.animating
+            or self._performance_hud is not None
+            or tracer.enabled
+            or self.screenshots.busy
+        )
+
+    def invalidate(self):
+        """Draw the window again in the next frame."""
+        self._dirty = True
+
+    def dispatch_event(self, event_type, *args):
+        if event_type in REDRAW_EVENTS:
+            self._dirty = True
+        return super().dispatch_event(event_type, *args)
+
     @contextmanager
     def apply_view(self, view: Mat4):
         prev_view = self.view
@@ -85,19 +187,23 @@ class GameWindow(Window):
         """
         if self._now == name:
             return
-        del self._scenes[name]
+        self._scenes.pop(name).delete()
 
+    @traced
     def switch_scene(self, name: str):
         """Switch to another scene."""
         if name not in self._scenes:
             raise NameError(f"scene '{name}' not found")
-        # Close the old one.
+        # Close the old one. Scenes are only paused while they are shown.
         if self._now != "":
+            if self._paused:
+                self._scenes[self._now].dispatch_event("on_scene_resume")
             self._scenes[self._now].frame.enable = False
             self._scenes[self._now].dispatch_event("on_scene_leave")
             self.remove_handlers(self._scenes[self._now])
         # Switch to the new one.
         self._now = name
+        self._dirty = True
         self._scenes[self._now].frame.enable = True
         if self._scenes[self._now].language != self.resource.language:
             self._scenes[self._now].dispatch_event("on_language_change")
@@ -107,15 +213,109 @@ class GameWindow(Window):
             self._mouse_x, self._mouse_y, 1, 1
         )
         self._scenes[self._now].dispatch_event("on_scene_enter")
+        if self._paused:
+            self._scenes[self._now].dispatch_event("on_scene_pause")
         self.push_handlers(self._scenes[self._now])
 
+    def schedule_draw(self):
+        """Draw the window at the frame rate of the setting.
+
+        It is drawn `BACKGROUND_FPS` times a second when it is not focused,
+        and not at all when it is hidden.
+        """
+        clock.unschedule(self.draw)
+        if not self._visible:
+            self.hitch_detector.pause()
+            return
+        interval = 1 / (self.setting["fps"] if self._active else BACKGROUND_FPS)
+        self.hitch_detector.budget = interval
+        clock.schedule_interval(self.draw, interval)
+
+    def _update_pause(self):
+        paused = not (self._active and self._visible)
+        if paused != self._paused and self._now != "":
+            event = "on_scene_pause" if paused else "on_scene_resume"
+            self._scenes[self._now].dispatch_event(event)
+        self._paused = paused
+        self.schedule_draw()
+
+    def toggle_performance_hud(self):
+        """Show or hide the frame time and draw call statistics."""
+        self.performance.enabled = not self.performance.enabled
+        if self.performance.enabled:
+            self._performance_hud = PerformanceHUD(self, self.performance)
+        elif self._performance_hud is not None:
+            self._performance_hud.delete()
+            self._performance_hud = None
+
+    def start_trace(self, frames: int = TRACE_FRAMES):
+        """Save a trace of the next `frames` frames into the log folder."""
+        tracer.start(frames, data_path / "log" / strftime("trace_%Y%m%d_%H%M%S.json"))
+
+    def _hitch_context(self) -> dict:
+        # Called by the watchdog thread, so only read what is there.
+        room = getattr(self._scenes.get(self._now), "room", None)
+        return {"scene": self._now, "room": None if room is None else room.name}
+
+    def draw(self, dt: float):
+        self.hitch_detector.frame()
+        # A few glyphs are rendered every frame, even if nothing is drawn.
+        self.resource.prewarm_glyphs()
+        if not self.needs_redraw:
+            return
+        self._dirty = False
+        tracer.begin_frame()
+        self.performance.begin_frame()
+        self._draw(dt)
+
+    @traced(name="GameWindow.draw")
+    def _draw(self, dt: float):
+        super().draw(dt)
+
+    def on_draw(self):
+        # Called after `on_draw` of the active scene.
+        self.performance.end_frame()
+        if self._performance_hud is not None:
+            self._performance_hud.draw()
+        self.screenshots.on_frame(*self.get_framebuffer_size())
+
+    def on_activate(self):
+        self._active = True
+        self._update_pause()
+
+    def on_deactivate(self):
+        self._active = False
+        self._update_pause()
+
+    def on_show(self):
+        self._visible = True
+        self._update_pause()
+
+    def on_hide(self):
+        self._visible = False
+        self._update_pause()
+
+    def on_close(self):
+        # OpenGL objects are freed while the context is still there.
+        clock.unschedule(self.draw)
+        for scene in self._scenes.values():
+            scene.delete()
+        self.screenshots.delete()
+        if self.world_target is not None:
+            self.world_target.delete()
+        super().on_close()
+
     def on_key_press(self, symbol, modifiers):
-        if symbol == key.F5:
-            filename = data_path / "screenshots" / strftime("%Y%m%d_%H%M%S.png")
-            if modifiers & key.MOD_SHIFT:
-                get_buffer_manager().get_depth_buffer().save(filename)
-            else:
-                get_buffer_manager().get_color_buffer().save(filename)
+        if symbol == key.F3:
+            self.toggle_performance_hud()
+        elif symbol == key.F4:
+            self.start_trace()
+        elif symbol == key.F5:
+            # Shift captures the depth buffer, and Ctrl captures a burst.
+            self.screenshots.capture(
+                depth=bool(modifiers & key.MOD_SHIFT),
+                frames=BURST_FRAMES if modifiers & key.MOD_CTRL else 1,
+            )
         elif symbol == key.F11:
             self.set_fullscreen(not self.fullscreen)
             if not self.fullscreen:
@@ -1,15 +1,18 @@
 from importlib import import_module
 from typing import Optional
 
-from pyglet import clock
 from pyglet.graphics import Batch
 
 from mystery.character import Character
 from mystery.scene import GameWindow, Scene
+from mystery.simulation import SimulationClock
+from mystery.trace import traced
 
+# Every room is named after its map, and has a module, a class and the
+# rooms behind its doors, which are prefetched when the room is entered.
 rooms = {
-    "start": ("start", "StartRoom"),
-    "start_tent": ("start", "StartTentRoom"),
+    "start": ("start", "StartRoom", ("start_tent",)),
+    "start_tent": ("start", "StartTentRoom", ("start",)),
 }
 
 
@@ -19,11 +22,24 @@ class GameScene(Scene):
         self._batch = Batch()
         self._cached_room = {}
         self._now_room = None
+        self._paused = False
         self.character = Character(self)
+        self.simulation = SimulationClock()
 
+    @property
+    def animating(self) -> bool:
+        # The game logic is run before every frame.
+        return not self._paused
+
+    @property
+    def room(self) -> Optional["mystery.room.base.BaseRoom"]:
+        """The room which the player is in."""
+        return self._now_room
+
+    @traced
     def switch_room(self, room_name: str, *args):
         """Load then switch to a room."""
-        module_name, class_name = rooms[room_name]
+        module_name, class_name, _ = rooms[room_name]
         if room_name not in self._cached_room:
             module = import_module(f"mystery.room.{module_name}")
             room = getattr(module, class_name)
@@ -34,23 +50,52 @@ class GameScene(Scene):
         self.character.batch = self._now_room.map_batches["char"]
         self.character.room = self._now_room
         self._now_room.dispatch_event("on_room_enter", *args)
+        self._prefetch_rooms(room_name)
 
+    def _prefetch_rooms(self, room_name: str):
+        """Parse maps of the rooms next to `room_name` in the background."""
+        for next_room in rooms[room_name][2]:
+            if next_room not in self._cached_room:
+                self.window.resource.prefetch_map(next_room)
+
+    @traced
     def on_draw(self):
+        # Game logic catches up with the time before every frame, then the
+        # character is drawn between the last two ticks.
+        if not self._paused:
+            self.simulation.tick()
+            self.character.interpolate(self.simulation.alpha)
         self.window.clear()
         if self._now_room is not None:
             self._now_room.draw()
-        self._batch.draw()
+        self.window.performance.draw("game.gui", self._batch)
 
     def on_scene_enter(self):
         self.window.push_handlers(self.character)
-        clock.schedule_interval(self.character.update, 4 / self.window.setting["fps"])
+        self.simulation.reset()
+        self.simulation.schedule(self.character.update)
         self.switch_room("start", "start_game")
 
+    def on_scene_pause(self):
+        self._paused = True
+        self.character.release_keys()
+
+    def on_scene_resume(self):
+        self._paused = False
+        # The time in the background is not caught up.
+        self.simulation.reset()
+
     def on_scene_leave(self):
-        clock.unschedule(self.character.update)
+        self.simulation.unschedule(self.character.update)
         self.window.remove_handlers(self.character)
         if self._now_room:
             self._now_room.dispatch_event("on_room_leave")
 
+    def delete(self):
+        for room in self._cached_room.values():
+            room.delete()
+        self._cached_room.clear()
+        self._now_room = None
+
 
 __all__ = ("GameScene",)
@@ -6,6 +6,7 @@ from pyglet.sprite import Sprite
 
 from mystery.gui.widgets import TextButton
 from mystery.scene import GameWindow, Scene
+from mystery.trace import traced
 
 
 class MenuScene(Scene):
@@ -86,6 +87,7 @@ class MenuScene(Scene):
                 self.window.switch_scene("start")
         else:
             self.background.opacity -= int(dt * 120)
+            self.invalidate()
             clock.schedule_once(self._animate, 1 / self.window.setting["fps"])
 
     def start(self):
@@ -104,9 +106,10 @@ class MenuScene(Scene):
             self.window.add_scene("settings.main", next_scene)
         self.window.switch_scene("settings.main")
 
+    @traced
     def on_draw(self):
         self.window.clear()
-        self.batch.draw()
+        self.window.performance.draw("menu", self.batch)
 
     def on_resize(self, width, height):
         self.background.position = (width // 2, height // 2, 0)
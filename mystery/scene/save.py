@@ -3,6 +3,7 @@ from pyglet.sprite import Sprite
 
 from mystery.gui.widgets import AdvancedFrame
 from mystery.scene import GameWindow, Scene
+from mystery.trace import traced
 
 
 class SaveLoadScene(Scene):
@@ -40,9 +41,10 @@ class SaveLoadScene(Scene):
         )
         self.frame.add_widget(self.select_frame)
 
+    @traced
     def on_draw(self):
         self.window.clear()
-        self.batch.draw()
+        self.window.performance.draw("save", self.batch)
 
     def on_resize(self, width, height):
         self.background.position = (width // 2, height // 2, 0)
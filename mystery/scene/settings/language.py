@@ -10,6 +10,7 @@ from mystery.gui.widgets import (
 )
 from mystery.resource.manager import SUPPORTED_LANG
 from mystery.scene import GameWindow, Scene
+from mystery.trace import traced
 
 
 class LanguageSettingScene(Scene):
@@ -80,9 +81,10 @@ class LanguageSettingScene(Scene):
         self.dispatch_event("on_language_change")
         self.window.switch_scene("settings.main")
 
+    @traced
     def on_draw(self):
         self.window.clear()
-        self.batch.draw()
+        self.window.performance.draw("language", self.batch)
 
     def on_key_release(self, symbol, modifiers):
         if symbol in [key.ENTER, key.SPACE]:
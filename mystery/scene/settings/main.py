@@ -6,6 +6,7 @@ from pyglet.window import key
 
 from mystery.gui.widgets import AdvancedFrame, TextButton
 from mystery.scene import GameWindow, Scene
+from mystery.trace import traced
 
 
 class SettingsScene(Scene):
@@ -104,9 +105,10 @@ class SettingsScene(Scene):
             self.window.add_scene(scene_name, next_scene)
         self.window.switch_scene(scene_name)
 
+    @traced
     def on_draw(self):
         self.window.clear()
-        self.batch.draw()
+        self.window.performance.draw("settings", self.batch)
 
     def on_key_release(self, symbol, modifiers):
         if symbol == key.ESCAPE:
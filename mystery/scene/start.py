@@ -9,6 +9,7 @@ from mystery import utils
 from mystery.gui.widgets import MessageBox
 from mystery.resource.manager import FONT_NAME
 from mystery.scene import GameWindow, Scene
+from mystery.trace import traced
 
 
 class StartScene(Scene):
@@ -35,6 +36,10 @@ class StartScene(Scene):
                 i += 1
 
     def _next_plot(self):
+        if self.message_box.revealing:
+            # The first press shows the whole text.
+            self.message_box.skip()
+            return
         if self._now_plot + 1 >= len(self._plots):
             if not self.window.has_scene("game"):
                 game_scene = import_module("mystery.scene.game").GameScene
@@ -44,9 +49,10 @@ class StartScene(Scene):
             self._now_plot += 1
         self.message_box.text = self._plots[self._now_plot]
 
+    @traced
     def on_draw(self):
         self.window.clear()
-        self._batch.draw()
+        self.window.performance.draw("start", self._batch)
 
     def on_key_release(self, symbol, modifiers):
         if symbol == key.SPACE:
@@ -0,0 +1,137 @@
+from atexit import register as atexit_register
+from concurrent.futures import ThreadPoolExecutor
+from ctypes import string_at
+from pathlib import Path
+from time import strftime
+
+from pyglet import gl
+from pyglet.image import ImageData
+
+# How many frames are captured by a burst.
+BURST_FRAMES = 10
+
+
+class _Readback:
+    """A frame being copied into a pixel buffer object by the GPU."""
+
+    def __init__(self, buffer: int, size: int, width: int, height: int, fmt: str):
+        self.buffer = buffer
+        self.size = size
+        self.width = width
+        self.height = height
+        self.format = fmt
+        self.filename = None
+        self.fence = gl.glFenceSync(gl.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+
+    @property
+    def ready(self) -> bool:
+        result = gl.glClientWaitSync(self.fence, 0, 0)
+        return result in (gl.GL_ALREADY_SIGNALED, gl.GL_CONDITION_SATISFIED)
+
+    def read(self) -> bytes:
+        gl.glDeleteSync(self.fence)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, self.buffer)
+        pointer = gl.glMapBufferRange(
+            gl.GL_PIXEL_PACK_BUFFER, 0, self.size, gl.GL_MAP_READ_BIT
+        )
+        data = string_at(pointer, self.size)
+        gl.glUnmapBuffer(gl.GL_PIXEL_PACK_BUFFER)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+        return data
+
+
+class ScreenshotCapture:
+    """Take screenshots without stalling the game.
+
+    The frame is copied into a pixel buffer object, which is only read when
+    the GPU is done, usually a frame later. The PNG file is then encoded by
+    a worker thread.
+    """
+
+    def __init__(self, directory: Path):
+        self._directory = directory
+        # [(depth, filename)] of the frames to capture.
+        self._requests: list[tuple[bool, str]] = []
+        self._readbacks: list[_Readback] = []
+        self._free_buffers: list[tuple[int, int]] = []
+        self._executor = None
+
+    @property
+    def busy(self) -> bool:
+        """Whether there are frames waiting to be captured or read."""
+        return bool(self._requests or self._readbacks)
+
+    def capture(self, depth: bool = False, frames: int = 1):
+        """Capture the next `frames` frames, or the depth buffer of them."""
+        stamp = strftime("%Y%m%d_%H%M%S")
+        if depth:
+            stamp += "_depth"
+        if frames == 1:
+            self._requests.append((depth, f"{stamp}.png"))
+        else:
+            for i in range(frames):
+                self._requests.append((depth, f"{stamp}_{i + 1:02}.png"))
+
+    def on_frame(self, width: int, height: int):
+        """Called when a frame is drawn, before the buffers are flipped."""
+        while self._readbacks and self._readbacks[0].ready:
+            readback = self._readbacks.pop(0)
+            data = readback.read()
+            self._free_buffers.append((readback.buffer, readback.size))
+            self._save(readback, data)
+        if self._requests:
+            depth, filename = self._requests.pop(0)
+            readback = self._read_pixels(depth, width, height)
+            readback.filename = filename
+            self._readbacks.append(readback)
+
+    def _buffer(self, size: int) -> int:
+        for i, (buffer, buffer_size) in enumerate(self._free_buffers):
+            if buffer_size == size:
+                del self._free_buffers[i]
+                return buffer
+        buffer = gl.GLuint()
+        gl.glGenBuffers(1, buffer)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, buffer)
+        gl.glBufferData(gl.GL_PIXEL_PACK_BUFFER, size, None, gl.GL_STREAM_READ)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+        return buffer.value
+
+    def _read_pixels(self, depth: bool, width: int, height: int) -> _Readback:
+        if depth:
+            fmt, gl_format = "R", gl.GL_DEPTH_COMPONENT
+        else:
+            fmt, gl_format = "RGBA", gl.GL_RGBA
+        size = len(fmt) * width * height
+        buffer = self._buffer(size)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, buffer)
+        gl.glPixelStorei(gl.GL_PACK_ALIGNMENT, 1)
+        # With a pixel buffer object bound, the pixels are copied into it
+        # and `glReadPixels` returns at once.
+        gl.glReadPixels(0, 0, width, height, gl_format, gl.GL_UNSIGNED_BYTE, 0)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+        return _Readback(buffer, size, width, height, fmt)
+
+    def _save(self, readback: _Readback, data: bytes):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="mystery-screenshot"
+            )
+            # Screenshots which are being encoded are still saved on exit.
+            atexit_register(self._executor.shutdown)
+        image = ImageData(readback.width, readback.height, readback.format, data)
+        self._executor.submit(image.save, str(self._directory / readback.filename))
+
+    def delete(self):
+        buffers = [buffer for buffer, _ in self._free_buffers]
+        buffers.extend(readback.buffer for readback in self._readbacks)
+        for readback in self._readbacks:
+            gl.glDeleteSync(readback.fence)
+        if buffers:
+            gl.glDeleteBuffers(len(buffers), (gl.GLuint * len(buffers))(*buffers))
+        self._free_buffers.clear()
+        self._readbacks.clear()
+        self._requests.clear()
+
+
+__all__ = "BURST_FRAMES", "ScreenshotCapture"
@@ -19,12 +19,21 @@ class Setting(UserDict):
             self.data["fps"] = 60
         if self.data.get("skip_start_scene", False) not in [True, False]:
             self.data["skip_start_scene"] = False
+        if self.data.get("world_scale") not in ["native", "integer", "sharp"]:
+            self.data["world_scale"] = "native"
+        if self.data.get("continuous_rendering") not in [True, False]:
+            self.data["continuous_rendering"] = False
+        if self.data.get("text_speed") not in [0, 20, 40, 80]:
+            self.data["text_speed"] = 40
 
     def _init_setting(self):
         self.data = {}
         self.data["fps"] = 60
         self.data["lang"] = "auto"
         self.data["skip_start_scene"] = False
+        self.data["world_scale"] = "native"
+        self.data["continuous_rendering"] = False
+        self.data["text_speed"] = 40
         self.save()
 
     def save(self):
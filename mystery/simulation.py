@@ -0,0 +1,87 @@
+from time import perf_counter
+from typing import Callable
+
+# Game logic runs 15 times a second, whatever the frame rate is.
+TICK_RATE = 15
+
+
+class SimulationClock:
+    """A clock that runs game logic at a fixed tick rate.
+
+    `tick` should be called once a frame. The time passed since the previous
+    frame is accumulated and consumed in fixed steps, so the game runs at the
+    same speed at any frame rate. `alpha` tells how far the frame is between
+    the last tick and the next one, which is used to interpolate positions.
+    """
+
+    def __init__(self, tick_rate: int = TICK_RATE, max_steps: int = 5):
+        self._step = 1 / tick_rate
+        self._max_steps = max_steps
+        self._funcs: list[Callable[[float], None]] = []
+        self._accumulator = 0.0
+        self._last_time = None
+        self._ticks = 0
+        self._frames = 0
+        self._skipped = 0
+        self._tick_time = 0.0
+
+    @property
+    def step(self) -> float:
+        return self._step
+
+    @property
+    def alpha(self) -> float:
+        return self._accumulator / self._step
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """Statistics of ticks and frames since the clock was created."""
+        return {
+            "tick_rate": 1 / self._step,
+            "ticks": self._ticks,
+            "frames": self._frames,
+            "skipped_ticks": self._skipped,
+            "ticks_per_frame": self._ticks / max(self._frames, 1),
+            "tick_time": self._tick_time / max(self._ticks, 1),
+        }
+
+    def schedule(self, func: Callable[[float], None]):
+        """Call `func` on every tick with the length of a tick."""
+        if func not in self._funcs:
+            self._funcs.append(func)
+
+    def unschedule(self, func: Callable[[float], None]):
+        if func in self._funcs:
+            self._funcs.remove(func)
+
+    def reset(self):
+        """Forget the time passed, e.g. after the game was paused."""
+        self._accumulator = 0.0
+        self._last_time = None
+
+    def tick(self) -> int:
+        """Run all ticks which are due and return how many were run."""
+        now = perf_counter()
+        if self._last_time is not None:
+            self._accumulator += now - self._last_time
+        self._last_time = now
+        self._frames += 1
+        steps = 0
+        while self._accumulator >= self._step:
+            if steps >= self._max_steps:
+                # Too far behind, e.g. after a long hitch. Drop the backlog
+                # instead of running ticks in a burst.
+                self._skipped += int(self._accumulator / self._step)
+                self._accumulator %= self._step
+                break
+            start = perf_counter()
+            for func in tuple(self._funcs):
+                func(self._step)
+            self._tick_time += perf_counter() - start
+            self._accumulator -= self._step
+            self._ticks += 1
+            steps += 1
+        return steps
+
+
+__all__ = "TICK_RATE", "SimulationClock"
@@ -0,0 +1,196 @@
+from math import floor
+from typing import Optional
+
+from pyglet import gl
+from pyglet.graphics import Batch, Group
+from pyglet.graphics.shader import Shader, ShaderProgram
+
+from mystery.resource.compiled_map import CHUNK_SIZE, CompiledTileLayer
+
+vertex_source = """
+    #version 150 core
+    in vec2 position;
+    in vec3 tex_coords;
+    out vec3 texture_coords;
+
+    uniform WindowBlock {
+        mat4 projection;
+        mat4 view;
+    } window;
+
+    void main() {
+        gl_Position = window.projection * window.view * vec4(position, 0.0, 1.0);
+        texture_coords = tex_coords;
+    }
+"""
+
+fragment_source = """
+    #version 150 core
+    in vec3 texture_coords;
+    out vec4 final_colors;
+
+    uniform sampler2D sprite_texture;
+
+    void main() {
+        final_colors = texture(sprite_texture, texture_coords.xy);
+    }
+"""
+
+vertex_shader = Shader(vertex_source, "vertex")
+fragment_shader = Shader(fragment_source, "fragment")
+tile_shader = ShaderProgram(vertex_shader, fragment_shader)
+
+
+class TileChunkGroup(Group):
+    """The group of a chunk which is drawn with one texture.
+
+    Unlike `SpriteGroup`, chunks never share a group with each other, so
+    every chunk can be hidden on its own.
+    """
+
+    def __init__(
+        self,
+        texture,
+        chunk: tuple[int, int],
+        order: int = 0,
+        parent: Optional[Group] = None,
+    ):
+        super().__init__(order, parent)
+        self.texture = texture
+        self.chunk = chunk
+        self.program = tile_shader
+
+    def set_state(self):
+        self.program.use()
+        gl.glActiveTexture(gl.GL_TEXTURE0)
+        gl.glBindTexture(self.texture.target, self.texture.id)
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+
+    def unset_state(self):
+        gl.glDisable(gl.GL_BLEND)
+        self.program.stop()
+
+    def __eq__(self, other: Group) -> bool:
+        return (
+            self.__class__ is other.__class__
+            and self._order == other.order
+            and self.parent == other.parent
+            and self.chunk == other.chunk
+            and self.texture.id == other.texture.id
+        )
+
+    def __hash__(self) -> int:
+        return hash((self._order, self.parent, self.chunk, self.texture.id))
+
+
+class TileChunk:
+    """A part of a tile layer baked into static vertex lists.
+
+    A chunk owns one vertex list for each texture used by its tiles.
+    """
+
+    def __init__(self, area: tuple[int, ...]):
+        # `area` is the bounding box of all tiles, see
+        # `CompiledTileLayer.chunks`.
+        self._area = area
+        self._visible = True
+        self._groups: list[TileChunkGroup] = []
+        self._vertex_lists = []
+
+    @property
+    def visible(self) -> bool:
+        return self._visible
+
+    @visible.setter
+    def visible(self, value: bool):
+        if self._visible == value:
+            return
+        self._visible = value
+        for group in self._groups:
+            group.visible = value
+
+    def intersects(self, area: tuple[int, ...]) -> bool:
+        x1, y1, w1, h1 = self._area
+        x2, y2, w2, h2 = area
+        return x1 < x2 + w2 and x2 < x1 + w1 and y1 < y2 + h2 and y2 < y1 + h1
+
+    def add(self, group: TileChunkGroup, vertex_list):
+        self._groups.append(group)
+        self._vertex_lists.append(vertex_list)
+
+    def delete(self):
+        for vertex_list in self._vertex_lists:
+            vertex_list.delete()
+        self._groups.clear()
+        self._vertex_lists.clear()
+
+
+class TileLayer:
+    """A `CompiledTileLayer` drawn by chunks instead of one sprite per tile."""
+
+    def __init__(
+        self,
+        layer: CompiledTileLayer,
+        tile_width: int,
+        tile_height: int,
+        batch: Optional[Batch] = None,
+        group: Optional[Group] = None,
+    ):
+        self._layer = layer
+        self._tile_width = tile_width
+        self._tile_height = tile_height
+        self._chunks: dict[tuple[int, int], TileChunk] = {}
+        self._build(batch, group)
+        self._visible_chunks = set(self._chunks.values())
+
+    def _build(self, batch: Optional[Batch], group: Optional[Group]):
+        # The vertices may be built by a worker thread already, see
+        # `ResourceManager.prefetch_map`.
+        images = self._layer.parent.images
+        for (column, row), (area, vertices) in self._layer.chunks().items():
+            chunk = TileChunk(area)
+            for gid, positions, tex_coords, indices in vertices:
+                chunk_group = TileChunkGroup(images[gid], (column, row), parent=group)
+                vertex_list = tile_shader.vertex_list_indexed(
+                    len(positions) // 2,
+                    gl.GL_TRIANGLES,
+                    indices,
+                    batch=batch,
+                    group=chunk_group,
+                    position=("f", positions),
+                    tex_coords=("f", tex_coords),
+                )
+                chunk.add(chunk_group, vertex_list)
+            self._chunks[(column, row)] = chunk
+
+    def cull(self, area: tuple[int, ...]):
+        """Only show the chunks which intersect `area`."""
+        x, y, w, h = area
+        size_x = CHUNK_SIZE * self._tile_width
+        size_y = CHUNK_SIZE * self._tile_height
+        # Tiles can stick out to the top and right of their chunk, so chunks
+        # on the left and bottom of `area` should be checked too.
+        c1, r1 = floor(x / size_x) - 1, floor(y / size_y) - 1
+        c2, r2 = floor((x + w) / size_x), floor((y + h) / size_y)
+        visible = set()
+        for column in range(c1, c2 + 1):
+            for row in range(r1, r2 + 1):
+                chunk = self._chunks.get((column, row))
+                if chunk is not None and chunk.intersects(area):
+                    visible.add(chunk)
+        for chunk in self._visible_chunks - visible:
+            chunk.visible = False
+        for chunk in visible - self._visible_chunks:
+            chunk.visible = True
+        self._visible_chunks = visible
+
+    def delete(self):
+        """Free the vertex lists of all chunks."""
+        for chunk in self._chunks.values():
+            chunk.delete()
+        self._chunks.clear()
+        self._visible_chunks.clear()
+
+
+__all__ = "CHUNK_SIZE", "TileChunkGroup", "TileChunk", "TileLayer"
@@ -0,0 +1,98 @@
+from functools import wraps
+from json import dump
+from os import getpid
+from pathlib import Path
+from threading import get_ident
+from time import perf_counter_ns
+from typing import Callable, Optional
+
+# How many frames are traced when F4 is pressed.
+TRACE_FRAMES = 120
+
+
+class Tracer:
+    """Record sections of frames as a Chrome trace.
+
+    The file can be opened by chrome://tracing or https://ui.perfetto.dev.
+    Sections are marked by `traced`, which does almost nothing when the
+    tracer is not running.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._events: list[tuple[str, int, int, int]] = []
+        self._frames = 0
+        self._filename = None
+
+    def start(self, frames: int, filename: Path):
+        """Trace the next `frames` frames and save them to `filename`."""
+        if self.enabled:
+            return
+        self._events.clear()
+        self._frames = frames
+        self._filename = filename
+        self.enabled = True
+
+    def add(self, name: str, start: int, end: int):
+        """Add a section which started and ended at `perf_counter_ns`."""
+        self._events.append((name, start, end, get_ident()))
+
+    def begin_frame(self):
+        # The trace is saved when the frame after the last one begins, so
+        # that the last frame is complete.
+        if not self.enabled:
+            return
+        if self._frames <= 0:
+            self.stop()
+        self._frames -= 1
+
+    def stop(self):
+        """Stop tracing and save the trace."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        pid = getpid()
+        events = [
+            {
+                "name": name,
+                "cat": "mystery",
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": (end - start) / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, start, end, tid in self._events
+        ]
+        self._events.clear()
+        with open(self._filename, "w+") as f:
+            dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+tracer = Tracer()
+
+
+def traced(func: Optional[Callable] = None, *, name: Optional[str] = None):
+    """Record every call of a function as a section of `tracer`.
+
+    It can be used as `@traced` or `@traced(name="...")`. The qualified name
+    of the function is used by default.
+    """
+    if func is None:
+        return lambda func: traced(func, name=name)
+    section = name or func.__qualname__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not tracer.enabled:
+            return func(*args, **kwargs)
+        start = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            tracer.add(section, start, perf_counter_ns())
+
+    return wrapper
+
+
+__all__ = "TRACE_FRAMES", "Tracer", "tracer", "traced"
@@ -1,51 +1,33 @@
-from textwrap import wrap
-from unicodedata import east_asian_width
-
-from mystery import resmgr
-
-
-def line_break_en(text: str, line_width: int, font_width: int = 24) -> str:
-    if text == "":
-        return ""
-    breaked = wrap(text, (line_width - 1) // font_width * 2)
-    return "\n".join(breaked)
-
-
-def line_break_cjk(text: str, line_width: int, font_width: int = 24) -> str:
-    if text == "":
-        return ""
-    breaked = text[0]
-    fw, fwh = font_width, font_width // 2
-    now_width = fw if east_asian_width(text[0]) in "FW" else fwh
-    punctuation = "。，、；："
-    for i in range(1, len(text)):
-        prev, this = text[i - 1], text[i]
-        cw1 = fw if east_asian_width(prev) in "FW" else fwh
-        cw2 = fw if east_asian_width(this) in "FW" else fwh
-        if this == "\n":
-            breaked += "\n"
-            now_width = 0
-        elif this in punctuation and now_width + cw2 > line_width:
-            breaked = breaked[:-1] + "\n" + prev + this
-            now_width = cw1 + cw2
-        elif now_width + cw2 > line_width:
-            breaked += "\n" + this
-            now_width = cw2
-        else:
-            breaked += this
-            now_width += cw2
-    return breaked
+from collections.abc import Callable, Iterable
+from math import ceil, floor
+
+from mystery.line_break import break_lines, glyph_advances
+
+
+def line_break_en(text: str, line_width: int, font_size: int = 18) -> str:
+    advances = glyph_advances(font_size)
+    return "\n".join(break_lines(text, line_width, advances.__getitem__))
+
+
+def line_break_cjk(text: str, line_width: int, font_size: int = 18) -> str:
+    # Small kana and iteration marks must not start a line either.
+    advances = glyph_advances(font_size)
+    lines = break_lines(text, line_width, advances.__getitem__, strict=True)
+    return "\n".join(lines)
 
 
-def line_break_func(text: str, line_width: int, font_width: int = 24) -> str:
+def line_break_func(text: str, line_width: int, font_size: int = 18) -> str:
+    # Imported here, so that importing this module does not load resources.
+    from mystery import resmgr
+
     lang2func = {
         "en": line_break_en,
         "cjk": line_break_cjk,
     }
     if (func := resmgr.translate("language.line_break_func")) in lang2func:
-        return lang2func[func](text, line_width, font_width)
+        return lang2func[func](text, line_width, font_size)
     else:
-        return line_break_en(text, line_width, font_width)
+        return line_break_en(text, line_width, font_size)
 
 
 class Rect:
@@ -57,6 +39,8 @@ class Rect:
         self._width = width
         self._height = height
         self._walkable = False
+        # Called with the rect when `walkable` is changed.
+        self._listeners: list[Callable[["Rect"], None]] = []
 
     def __contains__(self, pos: tuple[int, int]) -> bool:
         px, py = pos
@@ -88,7 +72,169 @@ class Rect:
 
     @walkable.setter
     def walkable(self, value: bool):
+        if self._walkable == value:
+            return
         self._walkable = value
-
-
-__all__ = "line_break_en", "line_break_cjk", "line_break_func", "Rect"
+        for listener in self._listeners:
+            listener(self)
+
+    def add_listener(self, listener: Callable[["Rect"], None]):
+        """Call `listener` with the rect whenever `walkable` is changed."""
+        self._listeners.append(listener)
+
+
+class RectGrid:
+    """A uniform grid which finds the rects in an area quickly.
+
+    Every rect is put into all cells it overlaps, so a query only tests the
+    rects in the cells of the area. Remove a rect before changing its area,
+    then add it again.
+    """
+
+    def __init__(self, cell_size: int = 64):
+        self._cell_size = cell_size
+        self._cells: dict[tuple[int, int], list[Rect]] = {}
+
+    def _hash(self, x: float, y: float) -> tuple[int, int]:
+        return int(x // self._cell_size), int(y // self._cell_size)
+
+    def _cells_of(self, rect: Rect):
+        x, y, width, height = rect.area
+        min_i, min_j = self._hash(x, y)
+        max_i, max_j = self._hash(x + width, y + height)
+        for i in range(min_i, max_i + 1):
+            for j in range(min_j, max_j + 1):
+                yield i, j
+
+    def add(self, *rects: Rect):
+        for rect in rects:
+            for cell in self._cells_of(rect):
+                self._cells.setdefault(cell, []).append(rect)
+
+    def remove(self, *rects: Rect):
+        for rect in rects:
+            for cell in self._cells_of(rect):
+                if rect in (cell_rects := self._cells.get(cell, [])):
+                    cell_rects.remove(rect)
+
+    def clear(self):
+        self._cells.clear()
+
+    def query_area(self, area: tuple[int, ...]) -> set[Rect]:
+        """Get all rects which are in the same cells as `area`."""
+        x, y, width, height = area
+        min_i, min_j = self._hash(x, y)
+        max_i, max_j = self._hash(x + width, y + height)
+        result = set()
+        for i in range(min_i, max_i + 1):
+            for j in range(min_j, max_j + 1):
+                result.update(self._cells.get((i, j), []))
+        return result
+
+
+class WalkMap:
+    """A bitmap of where a character can walk, in pixel resolution.
+
+    A pixel is walkable if it is inside a walkable rect and outside all of the
+    unwalkable ones. Each row is packed into an integer, one bit per pixel,
+    and so is each column, so that a straight move along either axis can be
+    checked at once. The bitmap is redrawn around a rect whose `walkable` is
+    changed.
+    """
+
+    def __init__(self, rects: Iterable[Rect]):
+        self._rects = list(rects)
+        self._grid = RectGrid()
+        self._grid.add(*self._rects)
+        if self._rects:
+            areas = [rect.area for rect in self._rects]
+            self._x = floor(min(x for x, _, _, _ in areas))
+            self._y = floor(min(y for _, y, _, _ in areas))
+            self._width = floor(max(x + w for x, _, w, _ in areas)) - self._x + 1
+            self._height = floor(max(y + h for _, y, _, h in areas)) - self._y + 1
+        else:
+            self._x = self._y = self._width = self._height = 0
+        self._rows = [0] * self._height
+        self._columns = [0] * self._width
+        self._render((0, 0, self._width - 1, self._height - 1))
+        for rect in self._rects:
+            rect.add_listener(self.update)
+
+    def _span(self, rect: Rect) -> tuple[int, ...]:
+        """Get pixels covered by `rect` as (x1, y1, x2, y2), both inclusive."""
+        x, y, width, height = rect.area
+        x1, y1 = ceil(x) - self._x, ceil(y) - self._y
+        x2, y2 = floor(x + width) - self._x, floor(y + height) - self._y
+        return x1, y1, x2, y2
+
+    @staticmethod
+    def _render_lines(lines: list[int], span: tuple[int, ...], spans: list):
+        # Redraw bits from `x1` to `x2` of lines from `y1` to `y2`, where
+        # `spans` is a list of (x1, y1, x2, y2, walkable) in the same axes.
+        x1, y1, x2, y2 = span
+        walk = [0] * (y2 - y1 + 1)
+        block = [0] * (y2 - y1 + 1)
+        for rx1, ry1, rx2, ry2, walkable in spans:
+            rx1, ry1 = max(rx1, x1), max(ry1, y1)
+            rx2, ry2 = min(rx2, x2), min(ry2, y2)
+            if rx1 > rx2 or ry1 > ry2:
+                continue
+            mask = ((1 << (rx2 - rx1 + 1)) - 1) << rx1
+            target = walk if walkable else block
+            for i in range(ry1 - y1, ry2 - y1 + 1):
+                target[i] |= mask
+        mask = ((1 << (x2 - x1 + 1)) - 1) << x1
+        for i in range(y2 - y1 + 1):
+            line = lines[y1 + i] & ~mask
+            lines[y1 + i] = line | (walk[i] & ~block[i] & mask)
+
+    def _render(self, span: tuple[int, ...]):
+        x1, y1, x2, y2 = span
+        if x1 > x2 or y1 > y2:
+            return
+        area = (x1 + self._x, y1 + self._y, x2 - x1, y2 - y1)
+        spans = []
+        for rect in self._grid.query_area(area):
+            spans.append((*self._span(rect), rect.walkable))
+        self._render_lines(self._rows, span, spans)
+        spans = [(ry1, rx1, ry2, rx2, w) for rx1, ry1, rx2, ry2, w in spans]
+        self._render_lines(self._columns, (y1, x1, y2, x2), spans)
+
+    def run(self, pos: tuple[int, int], direction: tuple[int, int]) -> int:
+        """Count walkable pixels in a line from `pos` towards `direction`.
+
+        `direction` is one of (1, 0), (-1, 0), (0, 1) and (0, -1). The pixel
+        at `pos` is counted too, so 0 is returned if it isn't walkable.
+        """
+        px, py = floor(pos[0]) - self._x, floor(pos[1]) - self._y
+        if not (0 <= px < self._width and 0 <= py < self._height):
+            return 0
+        dx, dy = direction
+        if dx != 0:
+            line, start, step = self._rows[py], px, dx
+        else:
+            line, start, step = self._columns[px], py, dy
+        if step > 0:
+            # Count trailing ones of the line shifted to `start`.
+            blocked = ~(line >> start)
+            return (blocked & -blocked).bit_length() - 1
+        else:
+            blocked = ~line & ((1 << (start + 1)) - 1)
+            return start + 1 - blocked.bit_length()
+
+    def update(self, rect: Rect):
+        """Redraw the area of `rect`."""
+        x1, y1, x2, y2 = self._span(rect)
+        x1, y1 = max(x1, 0), max(y1, 0)
+        x2, y2 = min(x2, self._width - 1), min(y2, self._height - 1)
+        self._render((x1, y1, x2, y2))
+
+
+__all__ = (
+    "line_break_en",
+    "line_break_cjk",
+    "line_break_func",
+    "Rect",
+    "RectGrid",
+    "WalkMap",
+)
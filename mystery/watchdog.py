@@ -0,0 +1,105 @@
+import sys
+from json import dumps
+from logging import INFO, Formatter, getLogger
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from threading import Event, Thread, main_thread
+from time import perf_counter, strftime
+from traceback import format_stack
+from typing import Callable
+
+logger = getLogger("mystery.hitch")
+logger.propagate = False
+
+
+class HitchDetector:
+    """Catch the frames which take too long and find out why.
+
+    The main thread calls `frame` once a frame. If the next call does not
+    come in `threshold` times the frame budget, a watchdog thread takes the
+    stack of the main thread and appends it to a rotating log.
+    """
+
+    def __init__(
+        self,
+        filename: Path,
+        context: Callable[[], dict],
+        budget: float = 1 / 60,
+        threshold: float = 2,
+    ):
+        self.budget = budget
+        self.threshold = threshold
+        self._filename = filename
+        self._context = context
+        self._frame = 0
+        self._frame_start = None
+        self._sampled_frame = 0
+        self._stop = Event()
+        self._thread = None
+        self._handler = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._handler = RotatingFileHandler(
+            self._filename, maxBytes=512 * 1024, backupCount=3, encoding="utf-8"
+        )
+        self._handler.setFormatter(Formatter("%(message)s"))
+        logger.addHandler(self._handler)
+        logger.setLevel(INFO)
+        self._stop.clear()
+        self._frame_start = None
+        self._thread = Thread(target=self._run, name="mystery-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        logger.removeHandler(self._handler)
+        self._handler.close()
+        self._handler = None
+
+    def frame(self):
+        """Tell the watchdog that a new frame begins."""
+        self._frame_start = perf_counter()
+        self._frame += 1
+
+    def pause(self):
+        """Stop watching until `frame` is called, e.g. before a long sleep."""
+        self._frame_start = None
+
+    def _run(self):
+        main_id = main_thread().ident
+        while not self._stop.wait(self.budget * self.threshold / 4):
+            start, frame = self._frame_start, self._frame
+            if start is None or frame == self._sampled_frame:
+                continue
+            elapsed = perf_counter() - start
+            if elapsed < self.budget * self.threshold:
+                continue
+            stack = sys._current_frames().get(main_id)
+            if stack is None:
+                continue
+            # Only one sample is taken for every slow frame.
+            self._sampled_frame = frame
+            self._record(elapsed, format_stack(stack))
+
+    def _record(self, elapsed: float, stack: list[str]):
+        try:
+            context = self._context()
+        except:
+            context = {}
+        record = {
+            "time": strftime("%Y-%m-%d %H:%M:%S"),
+            "elapsed": elapsed,
+            "budget": self.budget,
+            **context,
+            "stack": "".join(stack).splitlines(),
+        }
+        logger.info(dumps(record, ensure_ascii=False))
+
+
+__all__ = ("HitchDetector",)